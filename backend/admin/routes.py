@@ -0,0 +1,56 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+
+from backend.config import ADMIN_TOKEN
+from backend.slowlog import slow_query_log
+
+
+# =============================
+# Seguridad de /admin
+# =============================
+# No hay roles de usuario: los endpoints de administración se protegen con
+# un token compartido (ADMIN_TOKEN). Sin token configurado no existen (404).
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+# ---------------------------------------------------------
+# GET /admin/slow-queries
+# ---------------------------------------------------------
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    route: str | None = Query(None, description="Filtra por ruta, p. ej. 'GET /cards/search'"),
+):
+    """
+    Últimas consultas lentas de este proceso (las más recientes primero),
+    con parámetros (solo tipo y longitud salvo con SLOW_QUERY_LOG_PARAMS=1),
+    ruta de origen y, si se muestreó, el plan de EXPLAIN.
+    """
+    entries = slow_query_log.entries()
+    if route is not None:
+        entries = [entry for entry in entries if entry["route"] == route]
+    return {
+        "settings": slow_query_log.settings(),
+        "entries": entries[:limit],
+    }
+
+
+# ---------------------------------------------------------
+# DELETE /admin/slow-queries
+# ---------------------------------------------------------
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries():
+    slow_query_log.clear()
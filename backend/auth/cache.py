@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from backend.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+
+
+# =============================
+# Principal: usuario autenticado sin sesión ORM
+# =============================
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Datos mínimos del usuario autenticado que necesitan las rutas.
+    Es inmutable y no depende de ninguna sesión, así que puede compartirse
+    entre peticiones.
+    """
+    id: int
+    email: str
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, email=user.email, created_at=user.created_at)
+
+
+# =============================
+# Caché LRU con TTL de principals
+# =============================
+
+class PrincipalCache:
+    """
+    Caché acotada (LRU + TTL) de principals por user_id.
+
+    Es local a cada proceso: invalidate() solo limpia este worker, el TTL
+    limita cuánto tiempo puede quedar un dato antiguo en los demás.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        # user_id → momento del último cambio (para invalidar claims de tokens)
+        self._changed_at: dict[int, float] = {}
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, principal = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int, max_token_age: float):
+        """
+        Elimina el usuario de la caché y anota el cambio: los tokens emitidos
+        antes de este momento ya no pueden resolverse solo con sus claims.
+        """
+        now = time.time()
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._changed_at[user_id] = now
+            # Los cambios más antiguos que cualquier token válido ya no importan
+            for uid, ts in list(self._changed_at.items()):
+                if ts < now - max_token_age:
+                    del self._changed_at[uid]
+
+    def changed_since(self, user_id: int, issued_at: float) -> bool:
+        with self._lock:
+            return self._changed_at.get(user_id, 0) >= issued_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._changed_at.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
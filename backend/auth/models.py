@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from backend.database import Base
+
+
+# ============================================================
+# Modelo RefreshToken
+# Refresh tokens rotatorios (POST /auth/refresh)
+# ============================================================
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 del token: el valor en claro solo lo tiene el cliente
+    token_hash = Column(String(64), nullable=False, unique=True)
+    # Todos los tokens encadenados desde un mismo login comparten familia
+    family_id = Column(String(32), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
@@ -0,0 +1,145 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import BCRYPT_ROUNDS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+
+# =============================
+# Contexto de hashing (bcrypt)
+# =============================
+# Este módulo solo depende de passlib y de la configuración: los procesos
+# del pool lo importan sin crear engines ni cargar la app.
+#
+# min_rounds = coste actual → con deprecated="auto" un hash con menos
+# rondas (o de un esquema obsoleto) se marca para rehash en el login.
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+
+def hash_password_sync(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_update_sync(password: str, hashed: str) -> tuple[bool, str | None]:
+    """
+    (coincide, hash_nuevo). hash_nuevo no es None si el hash guardado
+    necesita actualizarse (coste o esquema antiguos).
+    """
+    return pwd_context.verify_and_update(password, hashed)
+
+
+# =============================
+# Pool de procesos acotado
+# =============================
+
+def _mp_context():
+    """
+    "forkserver" (o "spawn" donde no existe): los procesos no heredan hilos
+    ni conexiones del servidor. El forkserver precarga este módulo para que
+    cada proceso nuevo arranque ya con passlib/bcrypt importados.
+    Como con cualquier pool "spawn", un script que use la app debe tener
+    la guarda if __name__ == "__main__" (uvicorn/gunicorn ya la tienen).
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt fuera del event loop y del GIL del servidor.
+
+    - workers > 0: ProcessPoolExecutor con ese número de procesos.
+      workers = 0: threadpool de Starlette (desarrollo).
+    - max_pending: operaciones en cola o en curso a la vez; por encima se
+      responde 503 en lugar de acumular logins que acabarían en timeout.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_mp_context(),
+                )
+            return self._executor
+
+    def _discard_broken(self, broken: ProcessPoolExecutor):
+        """
+        Retira un pool roto solo si sigue siendo el actual: con varias
+        peticiones fallando a la vez, la primera lo recrea y las demás
+        reintentan en el nuevo sin tirarlo.
+        """
+        with self._executor_lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # Un proceso murió (OOM, kill): se recrea el pool y se reintenta una vez
+                self._discard_broken(executor)
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_sync, password, hashed)
+
+    def shutdown(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,120 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+
+from backend.auth.models import RefreshToken
+from backend.config import REFRESH_TOKEN_EXPIRE_DAYS
+
+
+# =============================
+# Refresh tokens rotatorios
+# =============================
+# - El token es un valor aleatorio de 256 bits; en la BD solo se guarda su
+#   SHA-256. Con esa entropía no hace falta un hash lento como bcrypt.
+# - Cada uso lo revoca y emite otro de la misma familia (rotación).
+# - Presentar un token ya rotado indica que se ha filtrado: se revoca toda
+#   la familia y el usuario tiene que volver a hacer login.
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def issue_refresh_token(db, user_id: int, family_id: str | None = None) -> str:
+    """
+    Crea un refresh token (nueva familia si no se indica) y lo añade a la
+    sesión. El commit lo hace la ruta. Devuelve el valor en claro.
+    """
+    now = datetime.utcnow()
+    if family_id is None:
+        family_id = secrets.token_hex(16)
+        # Al empezar una familia se purgan los tokens caducados del usuario
+        await db.execute(
+            delete(RefreshToken).where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.expires_at <= now,
+            )
+        )
+
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            created_at=now,
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def revoke_family(db, family_id: str):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+async def rotate_refresh_token(db, token: str) -> tuple[int, str]:
+    """
+    Canjea un refresh token por uno nuevo. Devuelve (user_id, token_nuevo).
+
+    La revocación es un UPDATE condicionado (revoked_at IS NULL): si dos
+    peticiones usan el mismo token a la vez, solo una lo consigue.
+    """
+    now = datetime.utcnow()
+    token_hash = hash_refresh_token(token)
+
+    row = (
+        await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+        )
+    ).first()
+
+    if row is None:
+        # Token ya rotado o revocado → posible robo: se corta la familia
+        family_id = await db.scalar(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_not(None),
+            )
+        )
+        if family_id is not None:
+            await revoke_family(db, family_id)
+            await db.commit()
+        raise _invalid_refresh_token()
+
+    new_token = await issue_refresh_token(db, row.user_id, row.family_id)
+    return row.user_id, new_token
+
+
+async def revoke_refresh_token(db, token: str):
+    """
+    Logout: revoca la familia del token (si existe). Idempotente.
+    """
+    family_id = await db.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+    if family_id is not None:
+        await revoke_family(db, family_id)
@@ -2,17 +2,23 @@ from datetime import timedelta, date
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config import ACCESS_TOKEN_EXPIRE_MINUTES
 from backend.database import get_db
 from backend import models
 from backend.auth import schemas
+from backend.auth.cache import Principal
+from backend.auth.refresh import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from backend.querystats import query_budget
 from backend.auth.utils import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
+    load_principal,
+    token_data_for,
 )
 
 # 🔽 IMPORTS PARA WORKLOGS (PASO C)
@@ -20,6 +26,28 @@ from backend.worklogs.models import WorkLog
 from backend.worklogs.schemas import WorkLogOut
 
 
+# Tablero y listas que recibe cada usuario al registrarse
+# (también los usa el generador de datos de backend/benchmarks)
+DEFAULT_BOARD_NAME = "Tablero principal"
+DEFAULT_LISTS = ("Por hacer", "En curso", "Hecho")
+
+
+def token_response(principal, refresh_token: str) -> dict:
+    """
+    Par access token (JWT) + refresh token para la respuesta de login/refresh.
+    """
+    access_token = create_access_token(
+        data=token_data_for(principal),  # "sub" como string + claims del principal
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+
 # Definimos router con prefijo /auth
 router = APIRouter(
     prefix="/auth",
@@ -31,7 +59,7 @@ router = APIRouter(
 # Crea un nuevo usuario, encripta su contraseña y genera un tablero inicial.
 # ========================================================================
 @router.post("/register", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def register_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register_user(payload: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Endpoint de registro.
     - Verifica si el email ya existe.
@@ -40,7 +68,7 @@ def register_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
     """
 
     # Comprobamos si ya existe un usuario con ese email
-    existing = db.query(models.User).filter(models.User.email == payload.email).first()
+    existing = await db.scalar(select(models.User).where(models.User.email == payload.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,26 +78,25 @@ def register_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
     # Creamos el usuario con la contraseña encriptada
     user = models.User(
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # Tablero inicial por requisitos de la Semana 1
-    default_board = models.Board(name="Tablero principal", user_id=user.id)
+    default_board = models.Board(name=DEFAULT_BOARD_NAME, user_id=user.id)
     db.add(default_board)
-    db.commit()
-    db.refresh(default_board)
+    await db.commit()
+    await db.refresh(default_board)
 
     # Listas básicas del tablero (Por hacer, En curso, Hecho)
     default_lists = [
-        models.List(name="Por hacer", order=1, board_id=default_board.id),
-        models.List(name="En curso", order=2, board_id=default_board.id),
-        models.List(name="Hecho", order=3, board_id=default_board.id),
+        models.List(name=name, order=order, board_id=default_board.id)
+        for order, name in enumerate(DEFAULT_LISTS, start=1)
     ]
     db.add_all(default_lists)
-    db.commit()
+    await db.commit()
 
     return user
 
@@ -79,36 +106,90 @@ def register_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
 # Valida credenciales y devuelve un token JWT usando OAuth2 password flow.
 # ========================================================================
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Endpoint de login con OAuth2 "password flow":
     - Swagger enviará username y password vía formulario.
     - Usamos username como email.
-    - Genera un token JWT válido durante 60 minutos.
+    - Genera un token JWT (ACCESS_TOKEN_EXPIRE_MINUTES) y un refresh token.
     """
 
     # En este flujo 'username' lo usamos como email
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
 
-    # Validar email + contraseña
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # Validar email + contraseña (bcrypt en el pool de procesos)
+    verified, new_hash = (
+        await verify_password_async(form_data.password, user.password_hash)
+        if user
+        else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Generar token válido 60 min
-    access_token_expires = timedelta(minutes=60)
-    access_token = create_access_token(
-        data={"sub": str(user.id)},  # mejor como string
-        expires_delta=access_token_expires,
-    )
+    # Rehash en el login: el hash usaba un coste o esquema ya obsoleto
+    if new_hash is not None:
+        user.password_hash = new_hash
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Access token (ACCESS_TOKEN_EXPIRE_MINUTES) + refresh token de una familia nueva.
+    # El commit guarda también el rehash, si lo hubo.
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
+
+    return token_response(user, refresh_token)
+
+
+# ========================================================================
+# POST /auth/refresh
+# Canjea un refresh token por un nuevo par de tokens, sin bcrypt.
+# ========================================================================
+@router.post("/refresh", response_model=schemas.Token)
+@query_budget(3)
+async def refresh_tokens(
+    payload: schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    - El refresh token usado queda revocado y se devuelve otro (rotación).
+    - Reutilizar un token ya rotado revoca toda su familia → 401.
+    - Solo cuesta un SHA-256 y un par de consultas indexadas.
+    """
+    user_id, refresh_token = await rotate_refresh_token(db, payload.refresh_token)
+
+    principal = await load_principal(db, user_id)
+    if principal is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await db.commit()
+
+    return token_response(principal, refresh_token)
+
+
+# ========================================================================
+# POST /auth/logout
+# Revoca el refresh token (y toda su familia).
+# ========================================================================
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    El access token sigue siendo válido hasta que caduca; el refresh token
+    deja de servir de inmediato. Es idempotente.
+    """
+    await revoke_refresh_token(db, payload.refresh_token)
+    await db.commit()
 
 
 # ========================================================================
@@ -116,7 +197,7 @@ def login(
 # Devuelve el usuario actual usando el token JWT (ruta protegida).
 # ========================================================================
 @router.get("/me", response_model=schemas.UserOut)
-def read_current_user(current_user: models.User = Depends(get_current_user)):
+async def read_current_user(current_user: Principal = Depends(get_current_user)):
     """
     Devuelve la información del usuario autenticado.
     Necesita un token válido (Authorization: Bearer <token>).
@@ -132,10 +213,10 @@ def read_current_user(current_user: models.User = Depends(get_current_user)):
     "/users/me/worklogs",
     response_model=list[WorkLogOut],
 )
-def get_my_worklogs(
+async def get_my_worklogs(
     week: str = Query(..., example="2024-18"),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     PASO C — Vista "Mis horas"
@@ -177,16 +258,17 @@ def get_my_worklogs(
     # 3️⃣ Query segura de worklogs
     # --------------------------------------------------
     worklogs = (
-        db.query(WorkLog)
-        .filter(
-            and_(
-                WorkLog.user_id == current_user.id,   # 🔐 solo horas propias
-                WorkLog.date >= start_date,
-                WorkLog.date <= end_date,
+        await db.scalars(
+            select(WorkLog)
+            .where(
+                and_(
+                    WorkLog.user_id == current_user.id,   # 🔐 solo horas propias
+                    WorkLog.date >= start_date,
+                    WorkLog.date <= end_date,
+                )
             )
+            .order_by(WorkLog.date.asc())
         )
-        .order_by(WorkLog.date.asc())
-        .all()
-    )
+    ).all()
 
     return worklogs
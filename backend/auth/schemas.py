@@ -41,6 +41,14 @@ class UserOut(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # Segundos de vida del access token
+    expires_in: int | None = None
+    # Se canjea en POST /auth/refresh por un nuevo par de tokens
+    refresh_token: str | None = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
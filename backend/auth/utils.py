@@ -1,14 +1,18 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.config import ACCESS_TOKEN_EXPIRE_MINUTES, PRINCIPAL_CACHE_TTL, TOKEN_EMBED_CLAIMS
 from backend.database import get_db
 from backend import models
+from backend.auth.cache import Principal, principal_cache
+from backend.auth.passwords import password_hasher, pwd_context
 
 # =============================
 # Configuración de JWT
@@ -17,14 +21,12 @@ from backend import models
 # En un proyecto real esto debería ir en variables de entorno (.env)
 SECRET_KEY = "super-secret-key-change-this"  # cámbialo por algo largo y aleatorio
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# ACCESS_TOKEN_EXPIRE_MINUTES viene de backend/config.py
 
 # =============================
 # Configuración de seguridad
 # =============================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # FastAPI usará este esquema para extraer el token del header Authorization: Bearer <token>
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -35,6 +37,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 def hash_password(password: str) -> str:
     """
     Recibe una contraseña en texto plano y devuelve un hash seguro (bcrypt).
+    Bloquea el hilo: en las rutas usar hash_password_async.
     """
     return pwd_context.hash(password)
 
@@ -46,6 +49,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+
+async def hash_password_async(password: str) -> str:
+    """
+    Igual que hash_password, pero en el pool de procesos (ver auth/passwords.py).
+    """
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verifica en el pool de procesos. Devuelve (coincide, hash_nuevo);
+    hash_nuevo viene relleno cuando el hash guardado debe rehacerse.
+    """
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
 # =============================
 # Utilidades para el token JWT
 # =============================
@@ -57,27 +75,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
 
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    # iat permite saber si el token es anterior a un cambio del usuario
+    to_encode.update({"exp": expire, "iat": now})
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(
+def token_expires_at(token: str) -> float | None:
+    """
+    Timestamp de caducidad ("exp") de un token válido, o None.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get("exp")
+
+
+def token_data_for(user) -> dict:
+    """
+    Payload del token para un usuario: siempre "sub" y, si TOKEN_EMBED_CLAIMS
+    está activo, los datos del principal para no consultar la BD al validarlo.
+    """
+    data = {"sub": str(user.id)}
+    if TOKEN_EMBED_CLAIMS:
+        data["email"] = user.email
+        data["created_at"] = user.created_at.isoformat()
+    return data
+
+
+def invalidate_user(user_id: int):
+    """
+    Invalidación explícita: llamar cuando un usuario cambia o se elimina.
+    """
+    principal_cache.invalidate(user_id, max_token_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+# Cualquier cambio o borrado de un User vía ORM invalida su principal
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user_on_change(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+async def load_principal(db, user_id: int) -> Principal | None:
+    """
+    Principal desde la caché o, si no está, desde la BD (None si no existe).
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(models.User, user_id)
+    if user is None:
+        return None
+
+    principal = Principal.from_user(user)
+    principal_cache.put(principal)
+    return principal
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
     """
     Dependencia que:
     - Lee el token del header Authorization.
     - Lo valida y decodifica.
-    - Busca el usuario en la base de datos.
-    - Devuelve el usuario si todo es correcto.
+    - Resuelve el usuario sin ir a la BD si es posible:
+        · claims incluidas en el token (con TOKEN_EMBED_CLAIMS, si el
+          usuario no ha cambiado después y el token es reciente)
+        · caché de principals (TTL PRINCIPAL_CACHE_TTL)
+    - Solo en un fallo de caché busca el usuario en la base de datos.
+    - Devuelve el principal si todo es correcto.
     """
 
     credentials_exception = HTTPException(
@@ -101,8 +179,29 @@ def get_current_user(
     except jwt.InvalidTokenError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    # 1) Claims del token, válidas mientras el usuario no cambie en este
+    #    proceso y como mucho PRINCIPAL_CACHE_TTL desde la emisión: los cambios
+    #    hechos en otro worker no llegan aquí, igual que con la caché
+    issued_at = payload.get("iat")
+    if (
+        TOKEN_EMBED_CLAIMS
+        and "email" in payload
+        and "created_at" in payload
+        and issued_at is not None
+        and time.time() - issued_at < PRINCIPAL_CACHE_TTL
+        and not principal_cache.changed_since(user_id, issued_at)
+    ):
+        try:
+            return Principal(
+                id=user_id,
+                email=payload["email"],
+                created_at=datetime.fromisoformat(payload["created_at"]),
+            )
+        except (TypeError, ValueError):
+            raise credentials_exception
 
-    return user
+    # 2) Caché de principals y 3) en un fallo de caché, la BD
+    principal = await load_principal(db, user_id)
+    if principal is None:
+        raise credentials_exception
+    return principal
@@ -0,0 +1,194 @@
+"""
+Comprobación de los presupuestos de consultas (@query_budget, ver
+backend/querystats.py).
+
+Ejecuta la app en este mismo proceso, pide cada ruta que declara
+presupuesto y la valida con assert_query_budget. Antes de cada petición
+vacía las cachés de principals, dueños de boards e informes: se mide el
+caso frío, que es el peor.
+
+Termina con código 1 si alguna ruta supera su presupuesto o si hay una ruta
+con presupuesto que no está en CHECKS (al añadir @query_budget a una ruta
+hay que añadirla aquí). Pensado para CI:
+
+    python -m backend.benchmarks.budgets
+
+Sin DATABASE_URL usa una base SQLite temporal. Con DATABASE_URL aplica las
+migraciones y crea un usuario nuevo en esa base (no borra nada).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import uuid
+
+# Semana cerrada en la que se registran las horas de prueba
+WEEK = "2025-23"
+WORKLOG_DATE = "2025-06-02"
+
+# Tarjetas de relleno (con etiqueta, subtarea y worklog; una de ellas
+# borrada): los presupuestos son el número exacto de sentencias y no deben
+# depender del tamaño del board. Una ruta con N+1 los superaría aquí.
+FILLER_CARDS = 20
+
+# (método, plantilla de la ruta, parámetros de la petición) para cada ruta
+# con presupuesto. Las plantillas se rellenan con los ids creados en setup().
+#
+# Cada presupuesto es el número fijo de sentencias del caso frío, sin
+# holgura: ninguna crece con los datos, así que una sentencia de más es
+# una regresión. "principal" es la carga del usuario del token y "dueño" la
+# comprobación de acceso al board (ambas en caché cuando está caliente).
+CHECKS = [
+    # 3: revocar el token usado (UPDATE ... RETURNING), principal, INSERT del nuevo
+    ("POST", "/auth/refresh", lambda ids: {"json": {"refresh_token": ids["refresh_token"]}}),
+    # 3: principal, versión de la lista (ETag), boards
+    ("GET", "/boards/", lambda ids: {}),
+    # 3: principal, dueño + revisión (ETag), listas
+    ("GET", "/boards/{board_id}/lists", lambda ids: {}),
+    # 5: principal, board (también dueño), listas, tarjetas, etiquetas
+    ("GET", "/boards/{board_id}/snapshot", lambda ids: {}),
+    # 7: principal, dueño + revisión, tarjetas cambiadas, sus etiquetas,
+    #    subtareas y worklogs, tombstones (since=0: el caso con más consultas)
+    ("GET", "/boards/{board_id}/changes", lambda ids: {"params": {"since": 0}}),
+    # 3: principal, dueño, búsqueda
+    ("GET", "/cards/search", lambda ids: {"params": {"board_id": ids["board_id"], "query": "informe"}}),
+    # 5: principal, tarjeta + dueño, revisión del board, UPDATE, refresh
+    ("PATCH", "/cards/{card_id}", lambda ids: {"json": {"title": "Informe revisado"}}),
+    # 7: principal, subtarea + dueño, revisión del board, revisión de la
+    #    tarjeta, contadores de la tarjeta, UPDATE, refresh
+    ("PATCH", "/subtasks/{subtask_id}", lambda ids: {"json": {"completed": True}}),
+    # 6: principal, etiqueta + dueño, revisión del board, revisión de la
+    #    tarjeta, tombstone, DELETE
+    ("DELETE", "/labels/{label_id}", lambda ids: {}),
+    # 4 en cada informe: principal, dueño, huella del rango, informe
+    ("GET", "/report/{board_id}/summary", lambda ids: {"params": {"week": WEEK}}),
+    ("GET", "/report/{board_id}/hours-by-user", lambda ids: {"params": {"week": WEEK}}),
+    ("GET", "/report/{board_id}/hours-by-card", lambda ids: {"params": {"week": WEEK}}),
+    ("GET", "/report/{board_id}/hours", lambda ids: {"params": {"week": WEEK, "group_by": "user,day"}}),
+    # 2: principal, worklogs de la semana
+    ("GET", "/users/me/worklogs", lambda ids: {"params": {"week": WEEK}}),
+    ("GET", "/users/me/worklogs/summary", lambda ids: {"params": {"week": WEEK}}),
+]
+
+
+def budgeted_routes(app) -> dict[tuple[str, str], int]:
+    """
+    (método, plantilla) → presupuesto de las rutas con @query_budget.
+    """
+    routes = {}
+    for route in app.routes:
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        if budget is None:
+            continue
+        for method in route.methods:
+            routes[(method, route.path)] = budget
+    return routes
+
+
+def setup(client) -> dict:
+    """
+    Usuario nuevo con su board por defecto, una tarjeta con etiqueta,
+    subtarea y worklog, y FILLER_CARDS tarjetas más iguales. Devuelve los
+    ids de la primera y los tokens.
+    """
+    email = f"budgets-{uuid.uuid4().hex[:12]}@example.com"
+    password = "budgets-password"
+
+    def ok(response):
+        response.raise_for_status()
+        return response.json()
+
+    ok(client.post("/auth/register", json={"email": email, "password": password}))
+    tokens = ok(client.post("/auth/login", data={"username": email, "password": password}))
+    client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+
+    board_id = ok(client.get("/boards/"))[0]["id"]
+    list_id = ok(client.get(f"/boards/{board_id}/lists"))[0]["id"]
+    card = ok(client.post("/cards/", json={
+        "title": "Revisar informe", "description": "Informe semanal", "board_id": board_id, "list_id": list_id,
+    }))
+    label = ok(client.post(f"/cards/{card['id']}/labels", json={"name": "urgente", "color": "red"}))
+    subtask = ok(client.post(f"/cards/{card['id']}/subtasks", json={"title": "Cifras"}))
+    ok(client.post(f"/cards/{card['id']}/worklogs", json={"date": WORKLOG_DATE, "hours": 1.5}))
+
+    for index in range(FILLER_CARDS):
+        filler = ok(client.post("/cards/", json={
+            "title": f"Informe {index}", "board_id": board_id, "list_id": list_id,
+        }))
+        ok(client.post(f"/cards/{filler['id']}/labels", json={"name": "relleno", "color": "blue"}))
+        ok(client.post(f"/cards/{filler['id']}/subtasks", json={"title": "Paso"}))
+        ok(client.post(f"/cards/{filler['id']}/worklogs", json={"date": WORKLOG_DATE, "hours": 1}))
+    ok(client.delete(f"/cards/{filler['id']}"))
+
+    return {
+        "refresh_token": tokens["refresh_token"],
+        "board_id": board_id,
+        "card_id": card["id"],
+        "label_id": label["id"],
+        "subtask_id": subtask["id"],
+    }
+
+
+def clear_caches():
+    from backend.auth.cache import principal_cache
+    from backend.boards.access import board_owner_cache
+    from backend.reportsweek.cache import report_cache
+
+    principal_cache.clear()
+    board_owner_cache.clear()
+    report_cache.clear()
+
+
+def run(warm: bool) -> list[str]:
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+    from backend.querystats import assert_query_budget
+
+    failures = []
+    budgets = budgeted_routes(app)
+    checked = {(method, template) for method, template, _ in CHECKS}
+    for method, template in sorted(set(budgets) - checked):
+        failures.append(f"{method} {template}: tiene presupuesto pero no está en CHECKS")
+
+    with TestClient(app) as client:
+        ids = setup(client)
+        print(f"{'ruta':<40} {'sentencias':>10} {'presupuesto':>11}")
+        for method, template, request_kwargs in CHECKS:
+            if not warm:
+                clear_caches()
+            response = client.request(method, template.format(**ids), **request_kwargs(ids))
+            label = f"{method} {template}"
+            used = response.headers.get("x-db-queries", "?")
+            budget = response.headers.get("x-db-query-budget", "-")
+            print(f"{label:<40} {used:>10} {budget:>11}")
+            if response.status_code >= 400:
+                failures.append(f"{label}: respuesta {response.status_code}")
+                continue
+            try:
+                assert_query_budget(response)
+            except AssertionError as exc:
+                failures.append(str(exc))
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warm", action="store_true", help="no vacía las cachés antes de cada petición")
+    args = parser.parse_args()
+
+    # La configuración se lee al importar backend: antes de cualquier import
+    os.environ["QUERY_STATS_HEADERS"] = "1"
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "budgets.db")
+
+    failures = run(args.warm)
+    if failures:
+        print("\n".join(["", "Presupuestos incumplidos:"] + failures))
+        return 1
+    print("\nTodas las rutas con presupuesto lo cumplen")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
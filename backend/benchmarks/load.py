@@ -0,0 +1,178 @@
+"""
+Driver de carga: clientes concurrentes contra los endpoints de lectura
+(GET /cards, búsqueda, informes semanales y resumen de "Mis horas").
+
+Cada cliente inicia sesión como uno de los usuarios del generador
+(backend.benchmarks.seed) y repite los endpoints elegidos en turno rotatorio
+durante --duration segundos. Lo medido en los --warmup primeros segundos
+se descarta.
+
+Uso (servidor aparte, con la misma DATABASE_URL que el seed):
+    uvicorn backend.main:app --workers 4
+    python -m backend.benchmarks.load --base-url http://127.0.0.1:8000 \\
+        --clients 20 --duration 30 --output antes.json
+
+Sin servidor (la app en este mismo proceso, útil en CI):
+    python -m backend.benchmarks.load --in-process --clients 5 --duration 10
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import date
+
+import httpx
+
+from backend.benchmarks.report import build_result, print_result, save, summarize
+from backend.benchmarks.seed import ANCHOR, EMAIL_TEMPLATE, PASSWORD, WORDS, weeks_before
+
+
+@dataclass
+class Session:
+    headers: dict
+    board_id: int
+    weeks: list[str]
+
+
+# Nombre → (ruta, parámetros) para una petición de ese endpoint
+ENDPOINTS = {
+    "cards.page": lambda s, rng: ("/cards/", {"board_id": s.board_id, "limit": 50}),
+    "cards.all": lambda s, rng: ("/cards/", {"board_id": s.board_id, "stream": "true"}),
+    "cards.search": lambda s, rng: (
+        "/cards/search", {"board_id": s.board_id, "query": rng.choice(WORDS)}
+    ),
+    "report.summary": lambda s, rng: (
+        f"/report/{s.board_id}/summary", {"week": rng.choice(s.weeks)}
+    ),
+    "report.hours_by_user": lambda s, rng: (
+        f"/report/{s.board_id}/hours-by-user", {"week": rng.choice(s.weeks)}
+    ),
+    "report.hours_by_card": lambda s, rng: (
+        f"/report/{s.board_id}/hours-by-card", {"week": rng.choice(s.weeks)}
+    ),
+    "report.hours": lambda s, rng: (
+        f"/report/{s.board_id}/hours", {"week": rng.choice(s.weeks), "group_by": "user,day"}
+    ),
+    "worklogs.summary": lambda s, rng: (
+        "/users/me/worklogs/summary", {"week": rng.choice(s.weeks)}
+    ),
+}
+
+
+async def open_session(client: httpx.AsyncClient, user_index: int, weeks: list[str]) -> Session:
+    response = await client.post(
+        "/auth/login",
+        data={"username": EMAIL_TEMPLATE.format(user_index), "password": PASSWORD},
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    boards = await client.get("/boards/", headers=headers)
+    boards.raise_for_status()
+    return Session(headers=headers, board_id=boards.json()[0]["id"], weeks=weeks)
+
+
+async def run_client(client, session: Session, endpoints: list[str], rng: random.Random,
+                     measure_from: float, deadline: float, samples, errors):
+    turn = rng.randrange(len(endpoints))
+    while time.perf_counter() < deadline:
+        name = endpoints[turn % len(endpoints)]
+        turn += 1
+        path, params = ENDPOINTS[name](session, rng)
+
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params=params, headers=session.headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if started < measure_from:
+            continue
+        if ok:
+            samples[name].append(elapsed_ms)
+        else:
+            errors[name] += 1
+
+
+async def run(args) -> dict:
+    endpoints = args.endpoints.split(",") if args.endpoints else list(ENDPOINTS)
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Endpoints desconocidos: {', '.join(sorted(unknown))}")
+    weeks = weeks_before(args.anchor, args.weeks)
+
+    async with AsyncExitStack() as stack:
+        limits = httpx.Limits(max_connections=args.clients)
+        if args.in_process:
+            from backend.database import async_engine
+            from backend.main import app
+
+            # Al salir se cierran las conexiones (los hilos de aiosqlite no son daemon)
+            if async_engine is not None:
+                stack.push_async_callback(async_engine.dispose)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", limits=limits, timeout=60
+            )
+        else:
+            client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60)
+        await stack.enter_async_context(client)
+
+        # Los logins (bcrypt) se hacen antes y en serie: no forman parte de la medición
+        sessions = [
+            await open_session(client, i % args.users, weeks) for i in range(args.clients)
+        ]
+
+        samples: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(*(
+            run_client(
+                client, session, endpoints, random.Random(args.seed + i),
+                measure_from, deadline, samples, errors,
+            )
+            for i, session in enumerate(sessions)
+        ))
+        duration = time.perf_counter() - measure_from
+
+    params = {
+        "target": "in-process" if args.in_process else args.base_url,
+        "clients": args.clients,
+        "users": args.users,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "endpoints": ",".join(endpoints),
+    }
+    return build_result(summarize(samples, errors, duration), params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="usa la app en este proceso (ASGI)")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--users", type=int, default=10, help="usuarios del seed entre los que se reparten los clientes")
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos de medición")
+    parser.add_argument("--warmup", type=float, default=3.0, help="segundos iniciales descartados")
+    parser.add_argument("--endpoints", default="", help=f"subconjunto separado por comas de: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--weeks", type=int, default=8, help="igual que en el seed")
+    parser.add_argument("--anchor", type=date.fromisoformat, default=ANCHOR)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="guarda el resultado en JSON para compararlo después")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_result(result)
+    if args.output:
+        save(args.output, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Informe de latencias del driver de carga y comparación entre ejecuciones.
+
+Por endpoint: peticiones, errores, throughput (req/s) y p50/p95/p99 en ms.
+Los resultados se guardan en JSON (--output del driver) con el commit y
+los parámetros, para poder comparar dos commits:
+
+    python -m backend.benchmarks.report show antes.json
+    python -m backend.benchmarks.report compare antes.json despues.json --threshold 10
+
+compare termina con código 1 si algún p95 empeora más de --threshold %.
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Percentil por rango más cercano sobre una lista ya ordenada.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: dict[str, list[float]], errors: dict[str, int], duration: float) -> dict:
+    """
+    samples: endpoint → latencias en ms de las peticiones correctas.
+    errors: endpoint → peticiones fallidas (status >= 400 o excepción).
+    duration: segundos de medición (sin el calentamiento).
+    """
+    endpoints = {}
+    for name in sorted(set(samples) | set(errors)):
+        values = sorted(samples.get(name, []))
+        count = len(values)
+        endpoints[name] = {
+            "requests": count,
+            "errors": errors.get(name, 0),
+            "rps": round(count / duration, 2) if duration else 0.0,
+            "mean_ms": round(sum(values) / count, 2) if count else 0.0,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "duration_s": round(duration, 2),
+        "requests": total,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "rps": round(total / duration, 2) if duration else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_result(summary: dict, params: dict) -> dict:
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": params,
+        **summary,
+    }
+
+
+def save(path: str, result: dict):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2, ensure_ascii=False)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# =========================================================
+# SALIDA EN TEXTO
+# =========================================================
+
+def print_result(result: dict):
+    params = result.get("params", {})
+    print(
+        f"commit {result.get('commit') or '?'}  "
+        + "  ".join(f"{k}={v}" for k, v in params.items())
+    )
+    print(f"{'endpoint':<24} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, e in result["endpoints"].items():
+        print(
+            f"{name:<24} {e['requests']:>7} {e['errors']:>5} {e['rps']:>8.1f} "
+            f"{e['p50_ms']:>8.2f} {e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f}"
+        )
+    print(
+        f"{'total':<24} {result['requests']:>7} {result['errors']:>5} {result['rps']:>8.1f}"
+        f"   ({result['duration_s']} s)"
+    )
+
+
+def _delta(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(before: dict, after: dict, threshold: float) -> list[str]:
+    """
+    Imprime la diferencia por endpoint y devuelve los endpoints cuyo p95
+    empeora más de `threshold` %.
+    """
+    print(f"antes: {before.get('commit') or '?'}   después: {after.get('commit') or '?'}")
+    if before.get("params") != after.get("params"):
+        print("aviso: los parámetros de las dos ejecuciones no coinciden")
+    print(f"{'endpoint':<24} {'req/s':>15} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17}")
+
+    regressions = []
+    for name in sorted(set(before["endpoints"]) & set(after["endpoints"])):
+        b, a = before["endpoints"][name], after["endpoints"][name]
+        cells = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{a[key]:>8.1f} {_delta(b[key], a[key]):>+6.0f}%")
+        print(f"{name:<24} " + " ".join(f"{c:>17}" for c in cells))
+        if _delta(b["p95_ms"], a["p95_ms"]) > threshold:
+            regressions.append(name)
+
+    for name in sorted(set(before["endpoints"]) ^ set(after["endpoints"])):
+        print(f"{name:<24} solo en una de las ejecuciones")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    show_parser = sub.add_parser("show")
+    show_parser.add_argument("result")
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="%% de empeoramiento de p95 tolerado")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print_result(load(args.result))
+        return 0
+
+    regressions = compare(load(args.before), load(args.after), args.threshold)
+    if regressions:
+        print(f"p95 empeora más de {args.threshold:g}% en: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Generador de datos sintéticos para benchmarks.
+
+Crea N usuarios, cada uno con sus boards y las listas por defecto de
+register_user, y en cada board tarjetas, etiquetas, subtareas y worklogs
+repartidos en las semanas anteriores a --anchor. Con la misma --seed y los
+mismos parámetros genera siempre los mismos datos.
+
+Usa DATABASE_URL (SQLite o PostgreSQL) y aplica antes las migraciones.
+Conviene partir de una base de datos vacía.
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m backend.benchmarks.seed --users 20 --cards 500
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from backend.auth.routes import DEFAULT_BOARD_NAME, DEFAULT_LISTS
+from backend.auth.utils import hash_password
+from backend.cards.models import Card, Label, Subtask
+from backend.database import engine
+from backend.migrations.runner import upgrade
+from backend.models import Board, List, User
+from backend.worklogs.models import WorkLog
+
+
+# Credenciales de los usuarios generados (las usa también el driver de carga)
+EMAIL_TEMPLATE = "bench{:05d}@example.com"
+PASSWORD = "benchmark-password"
+
+# Fecha de referencia fija: los datos (y las semanas que pide el driver)
+# no dependen del día en que se ejecuta
+ANCHOR = date(2025, 6, 2)
+
+WORDS = (
+    "informe revisar cliente factura despliegue servidor diseño reunión "
+    "presupuesto pruebas migración documentación contrato soporte incidencia "
+    "backend frontend móvil campaña auditoría inventario nómina proveedor"
+).split()
+LABEL_COLORS = ("red", "green", "blue", "yellow", "purple", "orange")
+
+
+def weeks_before(anchor: date, weeks: int) -> list[str]:
+    """
+    Semanas ISO (YYYY-WW) con datos: la de anchor y las `weeks - 1` anteriores.
+    """
+    result = []
+    for offset in range(weeks):
+        year, week, _ = (anchor - timedelta(weeks=offset)).isocalendar()
+        result.append(f"{year}-{week:02d}")
+    return result
+
+
+def insert_ids(conn, model, rows: list[dict]) -> list[int]:
+    """
+    INSERT múltiple que devuelve los ids en el orden de `rows`.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    result = conn.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+def make_card(rng: random.Random, anchor: date, weeks: int, owner_id: int, board_id: int, list_ids: list[int]) -> tuple[dict, dict]:
+    """
+    Tarjeta con sus hijos ya generados: (fila de cards, hijos). Los
+    totales desnormalizados se calculan aquí para que cuadren con los hijos.
+    """
+    start = datetime.combine(anchor - timedelta(weeks=weeks - 1), dt_time(), tzinfo=timezone.utc)
+    created = start + timedelta(minutes=rng.randint(0, weeks * 7 * 24 * 60 - 1))
+    updated = min(created + timedelta(hours=rng.randint(0, 72)), start + timedelta(weeks=weeks))
+
+    labels = [
+        {"name": rng.choice(WORDS)[:30], "color": rng.choice(LABEL_COLORS), "revision": 1}
+        for _ in range(rng.randint(0, 3))
+    ]
+    subtasks = [
+        {"title": f"Paso {k + 1}: {rng.choice(WORDS)}", "completed": rng.random() < 0.5, "revision": 1}
+        for k in range(rng.randint(0, 5))
+    ]
+    worklogs = []
+    for _ in range(rng.randint(0, 6)):
+        day = created.date() + timedelta(days=rng.randint(0, 13))
+        worklogs.append({
+            "user_id": owner_id,
+            "date": min(day, anchor + timedelta(days=6)),
+            "hours": rng.choice((0.5, 1.0, 1.5, 2.0, 3.0, 4.0)),
+            "note": rng.choice((None, f"{rng.choice(WORDS)} {rng.choice(WORDS)}")),
+            "revision": 1,
+        })
+
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+    card = {
+        "board_id": board_id,
+        "list_id": rng.choice(list_ids),
+        "user_id": owner_id,
+        "title": title[:80],
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30))) or None,
+        "due_date": (created + timedelta(days=rng.randint(1, 21))).date() if rng.random() < 0.6 else None,
+        "total_hours": sum(w["hours"] for w in worklogs),
+        "subtasks_total": len(subtasks),
+        "subtasks_completed": sum(1 for s in subtasks if s["completed"]),
+        "revision": 1,
+        "created_at": created,
+        "updated_at": updated,
+    }
+    return card, {"labels": labels, "subtasks": subtasks, "worklogs": worklogs}
+
+
+def seed_user(conn, rng: random.Random, index: int, password_hash: str, args) -> dict:
+    counts = {"boards": 0, "cards": 0, "labels": 0, "subtasks": 0, "worklogs": 0}
+
+    [user_id] = insert_ids(conn, User, [{
+        "email": EMAIL_TEMPLATE.format(index),
+        "password_hash": password_hash,
+        "created_at": datetime.combine(args.anchor, dt_time()) - timedelta(weeks=args.weeks),
+    }])
+
+    board_ids = insert_ids(conn, Board, [
+        {
+            "name": DEFAULT_BOARD_NAME if b == 0 else f"Proyecto {b}",
+            "user_id": user_id,
+            "revision": 1,
+        }
+        for b in range(args.boards)
+    ])
+    counts["boards"] = len(board_ids)
+
+    for board_id in board_ids:
+        list_ids = insert_ids(conn, List, [
+            {"board_id": board_id, "name": name, "order": order}
+            for order, name in enumerate(DEFAULT_LISTS, start=1)
+        ])
+
+        generated = [
+            make_card(rng, args.anchor, args.weeks, user_id, board_id, list_ids)
+            for _ in range(args.cards)
+        ]
+        card_ids = insert_ids(conn, Card, [card for card, _ in generated])
+        counts["cards"] += len(card_ids)
+
+        # Hijos con el card_id ya asignado, un INSERT múltiple por tabla
+        for key, model in (("labels", Label), ("subtasks", Subtask), ("worklogs", WorkLog)):
+            rows = [
+                {**child, "card_id": card_id}
+                for card_id, (_, children) in zip(card_ids, generated)
+                for child in children[key]
+            ]
+            if rows:
+                conn.execute(insert(model.__table__), rows)
+            counts[key] += len(rows)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--boards", type=int, default=1, help="boards por usuario")
+    parser.add_argument("--cards", type=int, default=200, help="tarjetas por board")
+    parser.add_argument("--weeks", type=int, default=8, help="semanas con datos hasta --anchor")
+    parser.add_argument("--anchor", type=date.fromisoformat, default=ANCHOR)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    applied = upgrade(engine)
+    if applied:
+        print(f"Migraciones aplicadas: {', '.join(applied)}")
+
+    with engine.connect() as conn:
+        existing = conn.scalar(
+            select(func.count()).select_from(User).where(User.email.like("bench%@example.com"))
+        )
+    if existing:
+        raise SystemExit(f"La base de datos ya tiene {existing} usuarios de benchmark; usa una vacía")
+
+    # Un solo hash para todos: el coste de bcrypt no es lo que se mide aquí
+    password_hash = hash_password(PASSWORD)
+    rng = random.Random(args.seed)
+
+    totals: dict[str, int] = {}
+    started = time.perf_counter()
+    for index in range(args.users):
+        # Una transacción por usuario
+        with engine.begin() as conn:
+            counts = seed_user(conn, rng, index, password_hash, args)
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    elapsed = time.perf_counter() - started
+
+    print(f"{engine.url.render_as_string(hide_password=True)}  ({elapsed:.1f} s)")
+    print(f"usuarios: {args.users}  " + "  ".join(f"{k}: {v}" for k, v in totals.items()))
+    print(f"semanas: {', '.join(weeks_before(args.anchor, args.weeks))}")
+
+
+if __name__ == "__main__":
+    main()
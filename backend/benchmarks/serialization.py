@@ -0,0 +1,108 @@
+"""
+Micro-benchmark de serialización de GET /cards.
+
+Compara, para N tarjetas con el formato de card_row_to_dict:
+- actual:  jsonable_encoder + JSONResponse (lo que hacía la ruta antes)
+- rápido:  FastJSONResponse (orjson)
+- stream:  lotes con dumps_items, como _stream_cards
+
+Uso:
+    python -m backend.benchmarks.serialization --cards 5000 --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.config import CARDS_STREAM_BATCH
+from backend.serialization import FastJSONResponse, dumps_items
+
+
+def make_cards(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    now = datetime(2025, 6, 2, 9, 30, tzinfo=timezone.utc)
+    cards = []
+    for i in range(1, n + 1):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        cards.append({
+            "id": i,
+            "title": f"Tarea {i} — revisar informe",
+            "description": "Descripción de la tarjeta " * rng.randint(0, 4) or None,
+            "due_date": date(2025, 6, 1) + timedelta(days=rng.randint(0, 60)) if i % 3 else None,
+            "board_id": 1,
+            "list_id": 1 + i % 3,
+            "user_id": 1 + i % 7,
+            "created_at": created,
+            "updated_at": created + timedelta(hours=rng.randint(0, 48)),
+            "total_hours": round(rng.uniform(0, 40), 2),
+            "labels": [
+                {"id": i * 10 + k, "card_id": i, "name": f"etiqueta{k}", "color": "red"}
+                for k in range(rng.randint(0, 3))
+            ],
+            "subtasks_total": rng.randint(0, 8),
+            "subtasks_completed": 0,
+        })
+    return cards
+
+
+def current_path(cards):
+    return JSONResponse(content=jsonable_encoder(cards)).body
+
+
+def fast_path(cards):
+    return FastJSONResponse(cards).body
+
+
+def stream_path(cards):
+    chunks = [b"["]
+    for start in range(0, len(cards), CARDS_STREAM_BATCH):
+        batch = cards[start:start + CARDS_STREAM_BATCH]
+        chunks.append((b"," if start else b"") + dumps_items(batch))
+    chunks.append(b"]")
+    return b"".join(chunks)
+
+
+def measure(fn, cards, repeat: int) -> list[float]:
+    fn(cards)  # calentamiento
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(cards)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cards = make_cards(args.cards)
+
+    # Los tres caminos deben producir el mismo JSON
+    reference = json.loads(current_path(cards))
+    assert json.loads(fast_path(cards)) == reference
+    assert json.loads(stream_path(cards)) == reference
+
+    print(f"{args.cards} tarjetas, {args.repeat} repeticiones, orjson {orjson.__version__}")
+    print(f"{'camino':<8} {'mediana ms':>11} {'p95 ms':>9} {'KB':>8}")
+
+    baseline = None
+    for name, fn in (("actual", current_path), ("rápido", fast_path), ("stream", stream_path)):
+        timings = sorted(measure(fn, cards, args.repeat))
+        median = statistics.median(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        size = len(fn(cards)) / 1024
+        baseline = baseline or median
+        print(f"{name:<8} {median:>11.2f} {p95:>9.2f} {size:>8.1f}   x{baseline / median:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import threading
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth.cache import Principal
+from backend.auth.utils import get_current_user
+from backend.cards.models import Card, Label, Subtask
+from backend.config import BOARD_OWNER_CACHE_SIZE
+from backend.database import get_db
+from backend.models import Board
+
+
+# =============================
+# Caché global board_id → owner (user_id)
+# =============================
+
+class BoardOwnerCache:
+    """
+    Mapa LRU acotado de board_id → user_id del dueño, compartido entre
+    peticiones del mismo proceso. Se invalida cuando un Board cambia o se borra.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._owners: OrderedDict[int, int] = OrderedDict()
+
+    def get(self, board_id: int) -> int | None:
+        with self._lock:
+            owner = self._owners.get(board_id)
+            if owner is not None:
+                self._owners.move_to_end(board_id)
+            return owner
+
+    def put(self, board_id: int, owner_id: int):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._owners[board_id] = owner_id
+            self._owners.move_to_end(board_id)
+            while len(self._owners) > self.maxsize:
+                self._owners.popitem(last=False)
+
+    def invalidate(self, board_id: int):
+        with self._lock:
+            self._owners.pop(board_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._owners.clear()
+
+
+board_owner_cache = BoardOwnerCache(BOARD_OWNER_CACHE_SIZE)
+
+
+@event.listens_for(Board, "after_update")
+@event.listens_for(Board, "after_delete")
+def _invalidate_board_owner(mapper, connection, target):
+    board_owner_cache.invalidate(target.id)
+
+
+# =============================
+# Servicio de autorización por petición
+# =============================
+
+class BoardAccess:
+    """
+    Resuelve si el usuario actual puede acceder a un board, tarjeta,
+    etiqueta o subtarea.
+
+    - Los boards se comprueban contra board_owner_cache (sin consulta si hay acierto).
+    - Tarjetas, etiquetas y subtareas se cargan con una única consulta que
+      une la fila con el dueño de su board, y de paso se rellena la caché.
+    - Lo ya resuelto en la petición se memoriza en la propia instancia.
+    """
+
+    def __init__(self, db: AsyncSession, current_user: Principal):
+        self.db = db
+        self.user_id = current_user.id
+        self._boards: dict[int, bool] = {}
+
+    async def can_access_board(self, board_id: int) -> bool:
+        if board_id in self._boards:
+            return self._boards[board_id]
+
+        owner_id = board_owner_cache.get(board_id)
+        if owner_id is None:
+            owner_id = await self.db.scalar(
+                select(Board.user_id).where(Board.id == board_id)
+            )
+            if owner_id is not None:
+                board_owner_cache.put(board_id, owner_id)
+
+        allowed = owner_id is not None and owner_id == self.user_id
+        self._boards[board_id] = allowed
+        return allowed
+
+    async def board_revision(self, board_id: int) -> int | None:
+        """
+        Revisión actual del board (None si no existe o es ajeno).
+        Una sola consulta que además comprueba el dueño.
+        """
+        row = (
+            await self.db.execute(
+                select(Board.user_id, Board.revision).where(Board.id == board_id)
+            )
+        ).first()
+        if row is None:
+            self._boards[board_id] = False
+            return None
+        board_owner_cache.put(board_id, row.user_id)
+        self._boards[board_id] = row.user_id == self.user_id
+        return row.revision if self._boards[board_id] else None
+
+    async def require_board(self, board_id: int, detail: str | None = None) -> int:
+        # 403 tanto si el board no existe como si es de otro usuario
+        if not await self.can_access_board(board_id):
+            raise HTTPException(status_code=403, detail=detail)
+        return board_id
+
+    def owns(self, board_id: int, owner_id: int) -> bool:
+        """
+        Comprobación con un dueño ya leído por la ruta (sin consulta extra).
+        """
+        board_owner_cache.put(board_id, owner_id)
+        self._boards[board_id] = owner_id == self.user_id
+        return self._boards[board_id]
+
+    def _check_owner(self, board_id: int, owner_id: int):
+        board_owner_cache.put(board_id, owner_id)
+        self._boards[board_id] = owner_id == self.user_id
+        if owner_id != self.user_id:
+            raise HTTPException(status_code=403)
+
+    async def card(self, card_id: int) -> Card:
+        row = (
+            await self.db.execute(
+                select(Card, Board.user_id)
+                .join(Board, Card.board_id == Board.id)
+                .where(Card.id == card_id)
+            )
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404)
+        card, owner_id = row
+        self._check_owner(card.board_id, owner_id)
+        return card
+
+    async def cards(self, card_ids) -> list:
+        """
+        Varias tarjetas con una sola consulta. Devuelve filas con
+        id, board_id, list_id, title, due_date y updated_at.
+        404 si falta alguna; 403 si alguna es de un board ajeno.
+        """
+        card_ids = set(card_ids)
+        rows = (
+            await self.db.execute(
+                select(
+                    Card.id,
+                    Card.board_id,
+                    Card.list_id,
+                    Card.title,
+                    Card.due_date,
+                    Card.updated_at,
+                    Board.user_id.label("owner_id"),
+                )
+                .join(Board, Card.board_id == Board.id)
+                .where(Card.id.in_(card_ids))
+            )
+        ).all()
+        if len(rows) != len(card_ids):
+            raise HTTPException(status_code=404)
+        for row in rows:
+            self._check_owner(row.board_id, row.owner_id)
+        return rows
+
+    async def label(self, label_id: int) -> Label:
+        row = (
+            await self.db.execute(
+                select(Label, Card.board_id, Board.user_id)
+                .join(Card, Label.card_id == Card.id)
+                .join(Board, Card.board_id == Board.id)
+                .where(Label.id == label_id)
+            )
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404)
+        label, board_id, owner_id = row
+        self._check_owner(board_id, owner_id)
+        return label
+
+    async def subtask(self, subtask_id: int) -> Subtask:
+        row = (
+            await self.db.execute(
+                select(Subtask, Card.board_id, Board.user_id)
+                .join(Card, Subtask.card_id == Card.id)
+                .join(Board, Card.board_id == Board.id)
+                .where(Subtask.id == subtask_id)
+            )
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404)
+        subtask, board_id, owner_id = row
+        self._check_owner(board_id, owner_id)
+        return subtask
+
+
+# Dependencia: una instancia por petición (FastAPI la cachea dentro de la petición)
+async def get_access(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> BoardAccess:
+    return BoardAccess(db, current_user)
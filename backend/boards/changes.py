@@ -0,0 +1,107 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.boards.models import Tombstone
+from backend.cards.models import Card, Label, Subtask
+from backend.cards.utils import CARD_ROW_COLUMNS, LABEL_ROW_COLUMNS, card_row_to_dict, group_labels
+from backend.worklogs.models import WorkLog
+
+
+# =========================================================
+# FEED DE CAMBIOS DE UN BOARD
+# =========================================================
+# Cada fila escrita lleva la revisión del board en la que cambió, y las
+# escrituras sobre etiquetas / subtareas / worklogs marcan también su
+# tarjeta. Por eso basta con localizar las tarjetas cambiadas (índice
+# board_id + revision) y buscar los hijos solo entre ellas: el coste crece
+# con el volumen de cambios, no con el tamaño del board.
+
+# Tombstone.entity → clave de la respuesta
+DELETED_KEYS = {
+    "card": "cards",
+    "label": "labels",
+    "subtask": "subtasks",
+    "worklog": "worklogs",
+}
+
+
+def _in_range(column, since: int, until: int):
+    return (column > since) & (column <= until)
+
+
+async def load_changes(db: AsyncSession, board_id: int, since: int, until: int) -> dict:
+    """
+    Cambios del board con revisión en (since, until]:
+    - cards: tarjetas creadas o modificadas (con todas sus etiquetas actuales)
+    - labels / subtasks / worklogs: hijos creados o modificados
+    - deleted: ids borrados por tipo. Borrar una tarjeta implica borrar
+      sus etiquetas, subtareas y worklogs (no se listan aparte).
+    """
+    deleted = {key: [] for key in DELETED_KEYS.values()}
+    if since >= until:
+        # Sin cambios: ni una consulta más
+        return {"cards": [], "labels": [], "subtasks": [], "worklogs": [], "deleted": deleted}
+
+    cards = (
+        await db.execute(
+            select(*CARD_ROW_COLUMNS)
+            .where(Card.board_id == board_id, _in_range(Card.revision, since, until))
+            .order_by(Card.id)
+        )
+    ).all()
+    card_ids = [card.id for card in cards]
+
+    labels, subtasks, worklogs = [], [], []
+    if card_ids:
+        labels = (
+            await db.execute(
+                select(*LABEL_ROW_COLUMNS, Label.revision)
+                .where(Label.card_id.in_(card_ids))
+                .order_by(Label.id)
+            )
+        ).all()
+        subtasks = (
+            await db.execute(
+                select(Subtask.id, Subtask.card_id, Subtask.title, Subtask.completed)
+                .where(Subtask.card_id.in_(card_ids), _in_range(Subtask.revision, since, until))
+                .order_by(Subtask.id)
+            )
+        ).all()
+        worklogs = (
+            await db.execute(
+                select(
+                    WorkLog.id,
+                    WorkLog.card_id,
+                    WorkLog.user_id,
+                    WorkLog.date,
+                    WorkLog.hours,
+                    WorkLog.note,
+                )
+                .where(WorkLog.card_id.in_(card_ids), _in_range(WorkLog.revision, since, until))
+                .order_by(WorkLog.id)
+            )
+        ).all()
+
+    tombstones = (
+        await db.execute(
+            select(Tombstone.entity, Tombstone.entity_id)
+            .where(Tombstone.board_id == board_id, _in_range(Tombstone.revision, since, until))
+            .order_by(Tombstone.id)
+        )
+    ).all()
+
+    labels_by_card = group_labels(labels)
+    for tomb in tombstones:
+        deleted[DELETED_KEYS[tomb.entity]].append(tomb.entity_id)
+
+    return {
+        "cards": [card_row_to_dict(card, labels_by_card.get(card.id, [])) for card in cards],
+        "labels": [
+            {"id": lbl.id, "card_id": lbl.card_id, "name": lbl.name, "color": lbl.color}
+            for lbl in labels
+            if since < lbl.revision <= until
+        ],
+        "subtasks": [dict(row._mapping) for row in subtasks],
+        "worklogs": [dict(row._mapping) for row in worklogs],
+        "deleted": deleted,
+    }
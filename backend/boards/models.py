@@ -0,0 +1,23 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from backend.database import Base
+
+
+# ============================================================
+# Modelo Tombstone
+# Marca de borrado para el feed de cambios (/boards/{id}/changes)
+# ============================================================
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_board_id_revision", "board_id", "revision"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    # "card", "label", "subtask" o "worklog"
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    # Revisión del board en la que se borró
+    revision = Column(Integer, nullable=False)
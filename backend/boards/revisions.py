@@ -0,0 +1,106 @@
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.boards.models import Tombstone
+from backend.cards.models import Card
+from backend.models import Board
+
+
+# =========================================================
+# REVISIÓN POR BOARD
+# =========================================================
+# boards.revision se incrementa en la misma transacción que cualquier
+# escritura sobre el contenido del board (listas, tarjetas, etiquetas,
+# subtareas, worklogs). Leerla es una consulta por clave primaria, así que
+# sirve como versión barata para ETag / If-None-Match.
+#
+# Las filas escritas se marcan con la nueva revisión (columna `revision`) y
+# los borrados dejan un Tombstone: es la base del feed de cambios. Como el
+# UPDATE de boards bloquea la fila hasta el commit, las revisiones de un
+# board se confirman en orden.
+
+
+async def bump_revision(db: AsyncSession, board_id: int) -> int | None:
+    """
+    Incrementa la revisión del board y devuelve la nueva.
+    """
+    result = await db.execute(
+        update(Board)
+        .where(Board.id == board_id)
+        .values(revision=Board.revision + 1)
+        .returning(Board.revision)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar()
+
+
+async def stamp_cards(db: AsyncSession, card_ids, revision: int):
+    """
+    Marca tarjetas con una revisión (sus totales o sus hijos cambiaron).
+    updated_at se conserva: no es una edición de la tarjeta.
+    """
+    await db.execute(
+        update(Card)
+        .where(Card.id.in_(list(card_ids)))
+        .values(revision=revision, updated_at=Card.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_card_revision(db: AsyncSession, card_id: int) -> tuple[int, int] | None:
+    """
+    Para escrituras sobre hijos de una tarjeta (etiquetas, subtareas,
+    worklogs): incrementa la revisión del board localizándolo desde la
+    tarjeta (sin consultar antes el board_id) y marca la tarjeta con ella.
+    Devuelve (board_id, revision), o None si la tarjeta no existe.
+    """
+    board_id = select(Card.board_id).where(Card.id == card_id).scalar_subquery()
+    row = (
+        await db.execute(
+            update(Board)
+            .where(Board.id == board_id)
+            .values(revision=Board.revision + 1)
+            .returning(Board.id, Board.revision)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    if row is None:
+        return None
+    await stamp_cards(db, [card_id], row.revision)
+    return row.id, row.revision
+
+
+def add_tombstones(db: AsyncSession, board_id: int, revision: int, entity: str, entity_ids):
+    """
+    Anota borrados para el feed de cambios (en la transacción en curso).
+    """
+    db.add_all(
+        Tombstone(board_id=board_id, entity=entity, entity_id=entity_id, revision=revision)
+        for entity_id in entity_ids
+    )
+
+
+# =========================================================
+# ETAG / PETICIONES CONDICIONALES
+# =========================================================
+def make_etag(*parts) -> str:
+    # Débil: el mismo contenido puede viajar comprimido o no
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (admite lista y "*").
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
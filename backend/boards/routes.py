@@ -1,29 +1,64 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.database import get_db
 from backend import models
+from backend.auth.cache import Principal
 from backend.auth.utils import get_current_user
+from backend.boards.access import BoardAccess, get_access
+from backend.boards.changes import load_changes
+from backend.boards.schemas import BoardChanges, BoardSnapshot
+from backend.boards.revisions import etag_matches, make_etag, not_modified
+from backend.querystats import query_budget
+from backend.cards.models import Card, Label
+from backend.cards.utils import (
+    CARD_ROW_COLUMNS,
+    LABEL_ROW_COLUMNS,
+    card_row_to_dict,
+    group_labels,
+)
+from backend.serialization import FastJSONResponse
 
 router = APIRouter(prefix="/boards", tags=["boards"])
 
 
 @router.get("/ping")
-def boards_ping(current_user: models.User = Depends(get_current_user)):
+async def boards_ping(current_user: Principal = Depends(get_current_user)):
     return {"message": f"Boards API OK for user {current_user.email}"}
 
 
 @router.get("/")
-def list_boards(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+@query_budget(3)
+async def list_boards(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
+    # Versión de la lista: nº de boards, último id y suma de revisiones
+    count, last_id, revisions = (
+        await db.execute(
+            select(
+                func.count(models.Board.id),
+                func.max(models.Board.id),
+                func.coalesce(func.sum(models.Board.revision), 0),
+            )
+            .where(models.Board.user_id == current_user.id)
+        )
+    ).one()
+    etag = make_etag("boards", current_user.id, count, last_id or 0, revisions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     boards = (
-        db.query(models.Board)
-        .filter(models.Board.user_id == current_user.id)
-        .order_by(models.Board.id)
-        .all()
-    )
+        await db.scalars(
+            select(models.Board)
+            .where(models.Board.user_id == current_user.id)
+            .order_by(models.Board.id)
+        )
+    ).all()
     return boards
 
 # ---------------------------------------------------------
@@ -31,30 +66,141 @@ def list_boards(
 # Devuelve las listas de un tablero concreto
 # ---------------------------------------------------------
 @router.get("/{board_id}/lists")
-def get_board_lists(
+@query_budget(3)
+async def get_board_lists(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    # Comprobar que el tablero pertenece al usuario
-    board = (
-        db.query(models.Board)
-        .filter(
-            models.Board.id == board_id,
-            models.Board.user_id == current_user.id
+    # Comprobar que el tablero pertenece al usuario (y leer su revisión)
+    revision = await access.board_revision(board_id)
+    if revision is None:
+        return {"detail": "No tienes acceso a este tablero"}
+
+    etag = make_etag("board-lists", board_id, revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    lists = (
+        await db.scalars(
+            select(models.List)
+            .where(models.List.board_id == board_id)
+            .order_by(models.List.id)
         )
-        .first()
-    )
+    ).all()
 
-    if not board:
-        return {"detail": "No tienes acceso a este tablero"}
+    return lists
+
+
+# ---------------------------------------------------------
+# GET /boards/{board_id}/snapshot
+# Todo lo necesario para pintar el tablero en una sola respuesta
+# ---------------------------------------------------------
+@router.get("/{board_id}/snapshot", response_model=BoardSnapshot)
+@query_budget(5)
+async def get_board_snapshot(
+    board_id: int,
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
+):
+    """
+    Board + listas + tarjetas (con etiquetas, progreso de subtareas y total
+    de horas). Siempre 4 consultas como máximo, sea cual sea el tamaño del
+    board: board, listas, tarjetas y etiquetas (las dos últimas filtradas
+    por board_id, sin IN con los ids).
+    """
+    # La fila del board sirve también para comprobar el dueño
+    board = (
+        await db.execute(
+            select(models.Board.id, models.Board.name, models.Board.user_id)
+            .where(models.Board.id == board_id)
+        )
+    ).first()
+    if board is None or not access.owns(board.id, board.user_id):
+        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
 
     lists = (
-        db.query(models.List)
-        .filter(models.List.board_id == board_id)
-        .order_by(models.List.id)
-        .all()
+        await db.execute(
+            select(
+                models.List.id,
+                models.List.board_id,
+                models.List.name,
+                models.List.order,
+            )
+            .where(models.List.board_id == board_id)
+            .order_by(models.List.id)
+        )
+    ).all()
+
+    cards = (
+        await db.execute(
+            select(*CARD_ROW_COLUMNS)
+            .where(Card.board_id == board_id)
+            .order_by(Card.list_id, Card.id)
+        )
+    ).all()
+
+    labels_by_card = group_labels(
+        await db.execute(
+            select(*LABEL_ROW_COLUMNS)
+            .join(Card, Label.card_id == Card.id)
+            .where(Card.board_id == board_id)
+            .order_by(Label.id)
+        )
     )
 
-    return lists
+    # Tarjetas agrupadas en su lista
+    cards_by_list: dict[int, list[dict]] = {}
+    for card in cards:
+        cards_by_list.setdefault(card.list_id, []).append(
+            card_row_to_dict(card, labels_by_card.get(card.id, []))
+        )
+
+    return FastJSONResponse({
+        "id": board.id,
+        "name": board.name,
+        "user_id": board.user_id,
+        "lists": [
+            {
+                "id": lst.id,
+                "board_id": lst.board_id,
+                "name": lst.name,
+                "order": lst.order,
+                "cards": cards_by_list.get(lst.id, []),
+            }
+            for lst in lists
+        ],
+    })
+
+
+# ---------------------------------------------------------
+# GET /boards/{board_id}/changes?since=<cursor>
+# Sincronización incremental
+# ---------------------------------------------------------
+@router.get("/{board_id}/changes", response_model=BoardChanges)
+@query_budget(7)
+async def get_board_changes(
+    board_id: int,
+    since: int = Query(0, ge=0, description="Cursor devuelto por la llamada anterior (0 = todo)"),
+    access: BoardAccess = Depends(get_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Tarjetas, etiquetas, subtareas y worklogs creados / modificados / borrados
+    después de `since`. El cursor es la revisión del board: la respuesta trae
+    el siguiente en `cursor` (igual a `since` si no hubo cambios).
+    """
+    revision = await access.board_revision(board_id)
+    if revision is None:
+        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
+
+    # Un cursor por delante del board (p. ej. tras restaurar la BD) no es válido
+    if since > revision:
+        raise HTTPException(status_code=409, detail="Cursor ahead of board revision; resync with since=0")
+
+    changes = await load_changes(db, board_id, since, revision)
 
+    return FastJSONResponse({"board_id": board_id, "since": since, "cursor": revision, **changes})
@@ -1,4 +1,48 @@
+from typing import List
+
 from pydantic import BaseModel
 
+from backend.cards.schemas import CardListItem, LabelOut, SubtaskOut
+from backend.worklogs.schemas import WorkLogOut
+
 class BoardBase(BaseModel):
     title: str
+
+
+# -------------------------------------------------------
+# SNAPSHOT (GET /boards/{id}/snapshot)
+# -------------------------------------------------------
+class SnapshotList(BaseModel):
+    id: int
+    board_id: int
+    name: str
+    order: int
+    cards: List[CardListItem]
+
+
+class BoardSnapshot(BaseModel):
+    id: int
+    name: str
+    user_id: int
+    lists: List[SnapshotList]
+
+
+# -------------------------------------------------------
+# CAMBIOS (GET /boards/{id}/changes)
+# -------------------------------------------------------
+class DeletedIds(BaseModel):
+    cards: List[int]
+    labels: List[int]
+    subtasks: List[int]
+    worklogs: List[int]
+
+
+class BoardChanges(BaseModel):
+    board_id: int
+    since: int
+    cursor: int
+    cards: List[CardListItem]
+    labels: List[LabelOut]
+    subtasks: List[SubtaskOut]
+    worklogs: List[WorkLogOut]
+    deleted: DeletedIds
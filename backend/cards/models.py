@@ -8,7 +8,9 @@ from sqlalchemy import (
     Date,
     DateTime,
     Boolean,
+    Float,
     ForeignKey,
+    Index,
     func
 )
 from sqlalchemy.orm import relationship
@@ -18,19 +20,32 @@ from backend.database import Base
 
 class Card(Base):
     __tablename__ = "cards"
+    __table_args__ = (
+        # Filtro por board + orden keyset (list_id, id) de GET /cards
+        Index("ix_cards_board_id_list_id_id", "board_id", "list_id", "id"),
+        # Feed de cambios: tarjetas del board con revisión > cursor
+        Index("ix_cards_board_id_revision", "board_id", "revision"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
     # Relaciones
     board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
-    list_id = Column(Integer, ForeignKey("lists.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    list_id = Column(Integer, ForeignKey("lists.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
 
     # Datos principales
     title = Column(String(80), nullable=False)
     description = Column(Text, nullable=True)
     due_date = Column(Date, nullable=True)
 
+    # Totales desnormalizados (ver cards/rollups.py)
+    total_hours = Column(Float, nullable=False, default=0, server_default="0")
+    subtasks_total = Column(Integer, nullable=False, default=0, server_default="0")
+    subtasks_completed = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Revisión del board en la que cambió por última vez (feed de cambios)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Timestamps
     created_at = Column(
@@ -59,9 +74,11 @@ class Label(Base):
     __tablename__ = "labels"
 
     id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(30), nullable=False)
     color = Column(String(20), nullable=False)
+    # Revisión del board en la que cambió por última vez (feed de cambios)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     card = relationship("Card", back_populates="labels")
 
@@ -71,8 +88,10 @@ class Subtask(Base):
     __tablename__ = "subtasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False)
+    card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(100), nullable=False)
     completed = Column(Boolean, default=False, nullable=False)
+    # Revisión del board en la que cambió por última vez (feed de cambios)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     card = relationship("Card", back_populates="subtasks")
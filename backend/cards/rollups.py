@@ -0,0 +1,133 @@
+from sqlalchemy import Numeric, case, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.cards.models import Card, Subtask
+from backend.worklogs.models import WorkLog
+
+
+# =========================================================
+# TOTALES DESNORMALIZADOS EN CARDS
+# =========================================================
+# - cards.total_hours = SUM(worklogs.hours) de la tarjeta.
+# - cards.subtasks_total / subtasks_completed = recuento de su checklist.
+# Las rutas de worklogs y subtareas los mantienen con incrementos dentro de
+# su propia transacción; las funciones rebuild_* los recalculan desde cero
+# si se desajustan.
+#
+# total_hours guarda la suma exacta (sin redondear en cada incremento, que
+# acumularía el error: 0.125 x 3 daría 0.39 en vez de 0.38). Se redondea a
+# HOURS_DECIMALS solo al leerlo (cards/utils.py) y al compararlo en la
+# reconciliación, así el ruido de coma flotante no cuenta como desajuste.
+
+HOURS_DECIMALS = 2
+
+
+def rounded_hours(expression):
+    # round(numeric, int): PostgreSQL no tiene round(double precision, int)
+    return func.round(cast(expression, Numeric), HOURS_DECIMALS)
+
+
+async def add_card_hours(db: AsyncSession, card_id: int, delta: float):
+    """
+    Suma `delta` horas al total de la tarjeta (en la transacción en curso).
+    El incremento se hace en SQL para que sea atómico frente a otras escrituras.
+    """
+    if not delta:
+        return
+    await db.execute(
+        update(Card)
+        .where(Card.id == card_id)
+        # updated_at se conserva: registrar horas no es editar la tarjeta
+        .values(total_hours=Card.total_hours + delta, updated_at=Card.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def add_cards_hours(db: AsyncSession, deltas: dict[int, float]):
+    """
+    Versión masiva de add_card_hours: {card_id: delta} en un solo UPDATE.
+    """
+    deltas = {card_id: delta for card_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await db.execute(
+        update(Card)
+        .where(Card.id.in_(deltas))
+        .values(
+            total_hours=Card.total_hours + case(deltas, value=Card.id, else_=0),
+            updated_at=Card.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def add_card_subtasks(db: AsyncSession, card_id: int, total: int = 0, completed: int = 0):
+    """
+    Ajusta los contadores de subtareas de la tarjeta (en la transacción en curso).
+    """
+    if not total and not completed:
+        return
+    await db.execute(
+        update(Card)
+        .where(Card.id == card_id)
+        .values(
+            subtasks_total=Card.subtasks_total + total,
+            subtasks_completed=Card.subtasks_completed + completed,
+            updated_at=Card.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_card_hours(connection) -> int:
+    """
+    Recalcula cards.total_hours a partir de worklogs.
+    Devuelve cuántas tarjetas tenían un total incorrecto (comparando con
+    HOURS_DECIMALS decimales).
+    """
+    hours = (
+        select(func.coalesce(func.sum(WorkLog.hours), 0))
+        .where(WorkLog.card_id == Card.id)
+        .scalar_subquery()
+    )
+    result = connection.execute(
+        update(Card)
+        .where(rounded_hours(Card.total_hours) != rounded_hours(hours))
+        .values(total_hours=hours, updated_at=Card.updated_at)
+    )
+    return result.rowcount
+
+
+def rebuild_card_subtasks(connection) -> int:
+    """
+    Recalcula los contadores de subtareas a partir de la tabla subtasks.
+    Devuelve cuántas tarjetas tenían algún contador incorrecto.
+    """
+    total = (
+        select(func.count(Subtask.id))
+        .where(Subtask.card_id == Card.id)
+        .scalar_subquery()
+    )
+    completed = (
+        select(func.coalesce(func.sum(case((Subtask.completed, 1), else_=0)), 0))
+        .where(Subtask.card_id == Card.id)
+        .scalar_subquery()
+    )
+    result = connection.execute(
+        update(Card)
+        .where((Card.subtasks_total != total) | (Card.subtasks_completed != completed))
+        .values(subtasks_total=total, subtasks_completed=completed, updated_at=Card.updated_at)
+    )
+    return result.rowcount
+
+
+# Comando de reconciliación:  python -m backend.cards.rollups
+if __name__ == "__main__":
+    from backend.database import engine
+    from backend import models  # noqa: F401  (registra User/Board/List)
+
+    with engine.begin() as conn:
+        fixed_hours = rebuild_card_hours(conn)
+        fixed_subtasks = rebuild_card_subtasks(conn)
+    print(f"total_hours: {fixed_hours} tarjetas corregidas")
+    print(f"subtasks_total/subtasks_completed: {fixed_subtasks} tarjetas corregidas")
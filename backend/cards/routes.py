@@ -1,15 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func   # ✅ NUEVO
-
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, tuple_, update   # ✅ NUEVO
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import (
+    CARDS_PAGE_DEFAULT_LIMIT,
+    CARDS_PAGE_MAX_LIMIT,
+    CARDS_STREAM_BATCH,
+    SEARCH_MAX_LIMIT,
+)
 from backend.database import get_db
+from backend.auth.cache import Principal
 from backend.auth.utils import get_current_user
+from backend.boards.access import BoardAccess, get_access
+from backend.boards.revisions import (
+    add_tombstones,
+    bump_card_revision,
+    bump_revision,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 
 from backend.cards.schemas import (
     CardCreate,
     CardUpdate,
     CardResponse,
     CardDeleteResponse,
+    CardBatchRequest,
+    CardBatchResponse,
+    CardListItem,
+    CardSearchResult,
     LabelCreate,
     LabelOut,
     SubtaskCreate,
@@ -17,8 +41,22 @@ from backend.cards.schemas import (
     SubtaskOut,
 )
 from backend.cards.models import Card, Label, Subtask
-from backend.models import Board, List, User
-from backend.worklogs.models import WorkLog   
+from backend.cards.rollups import add_card_subtasks
+from backend.cards.search import search_board_cards
+from backend.cards.utils import (
+    CARD_ROW_COLUMNS,
+    LABEL_ROW_COLUMNS,
+    card_row_to_dict,
+    decode_cursor,
+    encode_cursor,
+    group_labels,
+)
+from backend.models import List
+from backend.querystats import query_budget
+from backend.realtime.broker import publish_board_event
+from backend.serialization import FastJSONResponse, dumps_items
+from backend.reportsweek.cache import report_cache
+from backend.worklogs.models import WorkLog
 
 
 router = APIRouter(
@@ -30,33 +68,33 @@ extras_router = APIRouter(
     tags=["Cards"]
 )
 
+# Campos que puede cambiar una operación "update" de POST /cards/batch
+UPDATE_FIELDS = set(CardUpdate.model_fields)
+
 
 # ---------------------------------------------------------
 # POST /cards → Crear tarjeta
 # ---------------------------------------------------------
 @router.post("/", response_model=CardResponse)
-def create_card(
+async def create_card(
     card: CardCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    access: BoardAccess = Depends(get_access),
 ):
     # Comprobar que el tablero pertenece al usuario
-    board = db.query(Board).filter(
-        Board.id == card.board_id,
-        Board.user_id == current_user.id
-    ).first()
-
-    if not board:
-        raise HTTPException(
-            status_code=403,
-            detail="No tienes permiso para crear tarjetas en este tablero."
-        )
+    board_id = await access.require_board(
+        card.board_id,
+        detail="No tienes permiso para crear tarjetas en este tablero."
+    )
 
     # Buscar la lista "Por hacer"
-    por_hacer_list = db.query(List).filter(
-        List.board_id == board.id,
-        List.name.ilike("por hacer")
-    ).first()
+    por_hacer_list = await db.scalar(
+        select(List).where(
+            List.board_id == board_id,
+            List.name.ilike("por hacer")
+        )
+    )
 
     if not por_hacer_list:
         raise HTTPException(
@@ -64,19 +102,27 @@ def create_card(
             detail="La lista 'Por hacer' no existe."
         )
 
+    # Nueva revisión del board (antes del INSERT para marcar la fila con ella)
+    revision = await bump_revision(db, board_id)
+
     # Crear tarjeta (SIN order)
     new_card = Card(
         title=card.title,
         description=card.description,
         due_date=card.due_date,
-        board_id=board.id,
+        board_id=board_id,
         list_id=card.list_id,
-        user_id=current_user.id
+        user_id=current_user.id,
+        revision=revision,
     )
 
     db.add(new_card)
-    db.commit()
-    db.refresh(new_card)
+    await db.commit()
+    await db.refresh(new_card)
+
+    # Informes: "nuevas" de esta semana y "vencidas" de la semana de due_date
+    report_cache.touch(board_id, [new_card.created_at, new_card.due_date], hours=False)
+    await publish_board_event(board_id, revision, "card", "created", [new_card.id], card_id=new_card.id)
 
     return new_card
 
@@ -84,166 +130,196 @@ def create_card(
 # ---------------------------------------------------------
 # GET /cards?board_id=...
 # ---------------------------------------------------------
-@router.get("/", response_model=list[dict])
-def list_cards(
+async def _fetch_cards_page(
+    db: AsyncSession,
     board_id: int,
-    responsible_id: int | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    board = db.query(Board).filter(
-        Board.id == board_id,
-        Board.user_id == current_user.id
-    ).first()
-
-    if not board:
-        raise HTTPException(status_code=403)
+    responsible_id: int | None,
+    list_id: int | None,
+    after: tuple[int, int] | None,
+    limit: int,
+) -> list[dict]:
+    """
+    Devuelve hasta `limit` tarjetas del board ordenadas por (list_id, id),
+    empezando después de la clave `after` (paginación keyset).
+    """
 
     # -----------------------------------------------------
-    #  Obtener tarjetas + total de horas (agregación por tarjeta)
+    #  Obtener tarjetas + total de horas (columna mantenida por worklogs)
     # -----------------------------------------------------
     cards_query = (
-        db.query(
-            Card,
-            func.coalesce(func.sum(WorkLog.hours), 0).label("total_hours")
-        )
-        .outerjoin(WorkLog, WorkLog.card_id == Card.id)
-        .filter(Card.board_id == board_id)
-        .group_by(Card.id)
-        .order_by(Card.list_id)
+        select(*CARD_ROW_COLUMNS)
+        .where(Card.board_id == board_id)
+        .order_by(Card.list_id, Card.id)
+        .limit(limit)
     )
     # Filtro opcional por responsable
     if responsible_id is not None:
-        cards_query = cards_query.filter(Card.user_id == responsible_id)
+        cards_query = cards_query.where(Card.user_id == responsible_id)
+
+    # Modo por columna (Kanban): solo las tarjetas de una lista
+    if list_id is not None:
+        cards_query = cards_query.where(Card.list_id == list_id)
 
-    cards_with_hours = cards_query.all()
+    if after is not None:
+        cards_query = cards_query.where(tuple_(Card.list_id, Card.id) > tuple_(*after))
 
-    # Usamos los IDs para traer etiquetas y subtareas en bloque
-    card_ids = [card.id for card, _total in cards_with_hours]
+    cards_with_hours = (await db.execute(cards_query)).all()
+
+    # Usamos los IDs para traer las etiquetas en bloque
+    # (el progreso de subtareas ya viene en los contadores de la tarjeta)
+    card_ids = [row.id for row in cards_with_hours]
     labels_by_card: dict[int, list[dict]] = {}
-    subtasks_by_card: dict[int, dict] = {}
 
     if card_ids:
-        labels = db.query(Label).filter(Label.card_id.in_(card_ids)).all()
-        for lbl in labels:
-            labels_by_card.setdefault(lbl.card_id, []).append({
-                "id": lbl.id,
-                "card_id": lbl.card_id,
-                "name": lbl.name,
-                "color": lbl.color,
-            })
-
-        subtasks = db.query(Subtask).filter(Subtask.card_id.in_(card_ids)).all()
-        for st in subtasks:
-            entry = subtasks_by_card.setdefault(st.card_id, {"total": 0, "completed": 0})
-            entry["total"] += 1
-            if st.completed:
-                entry["completed"] += 1
+        labels_by_card = group_labels(
+            await db.execute(
+                select(*LABEL_ROW_COLUMNS).where(Label.card_id.in_(card_ids))
+            )
+        )
 
     # -----------------------------------------------------
     # Convertir a JSON incluyendo total_hours
     # -----------------------------------------------------
-    result = []
-
-    for card, total_hours in cards_with_hours:
-        subtask_summary = subtasks_by_card.get(card.id, {"total": 0, "completed": 0})
-        result.append({
-            "id": card.id,
-            "title": card.title,
-            "description": card.description,
-            "due_date": card.due_date,
-            "board_id": card.board_id,
-            "list_id": card.list_id,
-            "user_id": card.user_id,
-            "created_at": card.created_at,
-            "updated_at": card.updated_at,
-            "total_hours": float(total_hours),  
-            "labels": labels_by_card.get(card.id, []),
-            "subtasks_total": subtask_summary["total"],
-            "subtasks_completed": subtask_summary["completed"],
-        })
-
-    return result
+    return [
+        card_row_to_dict(card, labels_by_card.get(card.id, []))
+        for card in cards_with_hours
+    ]
 
 
-# ---------------------------------------------------------
-# GET /cards/search?query=...
-# ---------------------------------------------------------
-@router.get("/search", response_model=list[dict])
-def search_cards(
-    query: str,
+async def _stream_cards(db: AsyncSession, board_id: int, responsible_id, list_id):
+    """
+    Emite el array JSON completo por lotes keyset de CARDS_STREAM_BATCH
+    tarjetas: la memoria y cada consulta quedan acotadas por el lote.
+    Cada lote se codifica de una vez (serialization.dumps_items).
+
+    Tras leer cada lote se cierra la transacción, así la conexión vuelve al
+    pool mientras el cliente lee. Cada lote es una lectura aparte (no una
+    foto única del board): lo que cambie durante el envío se recupera con
+    GET /boards/{id}/changes?since=<revisión del ETag>. Si un lote falla, la
+    respuesta se corta sin cerrar el array (el 200 ya se envió).
+    """
+    yield b"["
+    after = None
+    first = True
+    while True:
+        page = await _fetch_cards_page(
+            db, board_id, responsible_id, list_id, after, CARDS_STREAM_BATCH
+        )
+        await db.commit()
+        if page:
+            yield (b"" if first else b",") + dumps_items(page)
+            first = False
+        if len(page) < CARDS_STREAM_BATCH:
+            break
+        after = (page[-1]["list_id"], page[-1]["id"])
+    yield b"]"
+
+
+@router.get("/", response_model=list[CardListItem])
+async def list_cards(
+    request: Request,
     board_id: int,
     responsible_id: int | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    list_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=CARDS_PAGE_MAX_LIMIT),
+    cursor: str | None = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    board = db.query(Board).filter(
-        Board.id == board_id,
-        Board.user_id == current_user.id
-    ).first()
-
-    if not board:
+    """
+    Tarjetas del board ordenadas por (list_id, id).
+
+    - Devuelve una página de `limit` tarjetas (CARDS_PAGE_DEFAULT_LIMIT si
+      no se indica); si hay más, la cabecera X-Next-Cursor trae el cursor
+      para pedir la siguiente (`cursor=...`).
+    - `stream=true`: todas las tarjetas en una sola respuesta, en streaming
+      por lotes (sin `limit` ni `cursor`).
+    - `list_id`: pagina una sola columna del Kanban.
+
+    Lleva ETag (revisión del board): con If-None-Match igual devuelve 304
+    sin consultar ni serializar las tarjetas.
+    """
+    # La revisión se lee antes que las tarjetas: el cuerpo nunca es más
+    # antiguo que su ETag
+    revision = await access.board_revision(board_id)
+    if revision is None:
         raise HTTPException(status_code=403)
 
-    # Base query limitada al board del usuario autenticado
-    cards_query = db.query(Card).filter(Card.board_id == board_id)
-
-    if responsible_id is not None:
-        cards_query = cards_query.filter(Card.user_id == responsible_id)
-
-    # Búsqueda por coincidencia parcial en título o descripción
-    like_query = f"%{query}%"
-    cards = (
-        cards_query
-        .filter(
-            (Card.title.ilike(like_query)) | (Card.description.ilike(like_query))
+    etag = make_etag("cards", board_id, revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if stream:
+        if limit is not None or after is not None:
+            raise HTTPException(status_code=400, detail="stream does not take limit or cursor")
+        return StreamingResponse(
+            _stream_cards(db, board_id, responsible_id, list_id),
+            media_type="application/json",
+            headers={"ETag": etag},
         )
-        .order_by(Card.list_id)
-        .all()
-    )
 
-    return [
-        {
-            "id": card.id,
-            "title": card.title,
-            "description": card.description,
-            "due_date": card.due_date,
-            "board_id": card.board_id,
-            "list_id": card.list_id,
-            "user_id": card.user_id,
-            "created_at": card.created_at,
-            "updated_at": card.updated_at,
-        }
-        for card in cards
-    ]
+    if limit is None:
+        limit = min(CARDS_PAGE_DEFAULT_LIMIT, CARDS_PAGE_MAX_LIMIT)
 
+    # Se pide un elemento extra para saber si existe página siguiente
+    page = await _fetch_cards_page(db, board_id, responsible_id, list_id, after, limit + 1)
 
-def _get_card_or_404(card_id: int, db: Session) -> Card:
-    # Helper para centralizar el "no encontrado"
-    card = db.query(Card).filter(Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404)
-    return card
+    headers = {"ETag": etag}
+    if len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(page[-1]["list_id"], page[-1]["id"])
 
+    return FastJSONResponse(page, headers=headers)
 
-def _assert_card_owner(card: Card, current_user: User):
-    # Validación de acceso: solo dueño del board
-    if card.board.user_id != current_user.id:
-        raise HTTPException(status_code=403)
+
+# ---------------------------------------------------------
+# GET /cards/search?query=...
+# ---------------------------------------------------------
+@router.get("/search", response_model=list[CardSearchResult])
+@query_budget(3)
+async def search_cards(
+    query: str,
+    board_id: int,
+    responsible_id: int | None = None,
+    limit: int = Query(50, ge=1, le=SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
+):
+    """
+    Búsqueda de texto completo en título y descripción (índice tsvector/GIN
+    en PostgreSQL, FTS5 en SQLite), ordenada por relevancia y con fragmentos
+    resaltados. title_highlight y snippet van escapados como HTML: solo
+    contienen <mark>...</mark> como marcado.
+    """
+    await access.require_board(board_id)
+
+    results = await search_board_cards(db, board_id, query, responsible_id, limit, offset)
+    return FastJSONResponse(results)
 
 
 # ---------------------------------------------------------
 # PATCH /cards/{id} → Editar tarjeta
 # ---------------------------------------------------------
 @router.patch("/{card_id}", response_model=CardResponse)
-def update_card(
+@query_budget(5)
+async def update_card(
     card_id: int,
     card_update: CardUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
+    card = await access.card(card_id)
+    previous = (card.updated_at, card.due_date, card.title, card.list_id)
+    card.revision = await bump_revision(db, card.board_id)
 
     if card_update.title is not None:
         if not card_update.title.strip():
@@ -257,18 +333,32 @@ def update_card(
         card.due_date = card_update.due_date
 
     if card_update.list_id is not None:
-        list_obj = db.query(List).filter(
-            List.id == card_update.list_id,
-            List.board_id == card.board_id
-        ).first()
+        list_obj = await db.scalar(
+            select(List).where(
+                List.id == card_update.list_id,
+                List.board_id == card.board_id
+            )
+        )
 
         if not list_obj:
             raise HTTPException(status_code=400)
 
         card.list_id = card_update.list_id
 
-    db.commit()
-    db.refresh(card)
+    await db.commit()
+    await db.refresh(card)
+
+    # Informes: el resumen depende de updated_at / due_date (antes y ahora);
+    # las horas por tarjeta muestran título y lista de cualquier semana
+    report_cache.touch(
+        card.board_id,
+        [previous[0], previous[1], card.updated_at, card.due_date],
+        hours=False,
+    )
+    if previous[2:] != (card.title, card.list_id):
+        report_cache.invalidate_board(card.board_id, summary=False)
+
+    await publish_board_event(card.board_id, card.revision, "card", "updated", [card.id], card_id=card.id)
 
     return card
 
@@ -277,63 +367,195 @@ def update_card(
 # DELETE /cards/{id}
 # ---------------------------------------------------------
 @router.delete("/{card_id}", response_model=CardDeleteResponse)
-def delete_card(
+async def delete_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
+    card = await access.card(card_id)
 
-    db.delete(card)
-    db.commit()
+    await db.delete(card)
+    revision = await bump_revision(db, card.board_id)
+    # Basta con la tarjeta: sus etiquetas, subtareas y worklogs van con ella
+    add_tombstones(db, card.board_id, revision, "card", [card.id])
+    await db.commit()
+
+    # Sus worklogs se borran en cascada: afecta a cualquier semana
+    report_cache.invalidate_board(card.board_id)
+    await publish_board_event(card.board_id, revision, "card", "deleted", [card.id], card_id=card.id)
 
     return {"message": "Tarjeta eliminada correctamente."}
 
 
+# ---------------------------------------------------------
+# POST /cards/batch → Mover / editar / borrar varias tarjetas
+# ---------------------------------------------------------
+@router.post("/batch", response_model=CardBatchResponse)
+async def batch_cards(
+    payload: CardBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
+):
+    """
+    Aplica todas las operaciones en una sola transacción (todo o nada):
+    - una consulta para autorizar todas las tarjetas
+    - una consulta para validar las listas destino
+    - UPDATE agrupados por valores idénticos (mover una columna entera es
+      un solo UPDATE) y un DELETE por tabla para los borrados
+    """
+    operations = payload.operations
+    card_ids = [op.card_id for op in operations]
+    if len(set(card_ids)) != len(card_ids):
+        raise HTTPException(status_code=400, detail="Cada tarjeta puede aparecer una sola vez.")
+
+    for op in operations:
+        if op.op == "move" and op.list_id is None:
+            raise HTTPException(status_code=400, detail=f"Falta list_id para mover la tarjeta {op.card_id}.")
+        if op.op == "update" and not op.model_dump(include=UPDATE_FIELDS, exclude_none=True):
+            raise HTTPException(status_code=400, detail=f"La operación update de la tarjeta {op.card_id} no cambia nada.")
+        if op.op == "update" and op.title is not None and not op.title.strip():
+            raise HTTPException(status_code=400)
+
+    # Autorización: una consulta para todas las tarjetas
+    cards = {row.id: row for row in await access.cards(card_ids)}
+
+    # Listas destino: una consulta, y deben ser del board de la tarjeta
+    list_ids = {op.list_id for op in operations if op.op != "delete" and op.list_id is not None}
+    list_boards = {}
+    if list_ids:
+        list_boards = dict(
+            (await db.execute(select(List.id, List.board_id).where(List.id.in_(list_ids)))).all()
+        )
+    for op in operations:
+        if op.op != "delete" and op.list_id is not None:
+            if list_boards.get(op.list_id) != cards[op.card_id].board_id:
+                raise HTTPException(status_code=400)
+
+    # Una revisión nueva por board afectado (en orden, para no bloquearse)
+    revisions = {
+        board_id: await bump_revision(db, board_id)
+        for board_id in sorted({row.board_id for row in cards.values()})
+    }
+
+    # -----------------------------
+    # Agrupar: mismos valores (y board) → un único UPDATE ... WHERE id IN (...)
+    # -----------------------------
+    groups = defaultdict(list)
+    updated, deleted = [], []
+    for op in operations:
+        if op.op == "delete":
+            deleted.append(op.card_id)
+            continue
+        if op.op == "move":
+            fields = {"list_id": op.list_id}
+        else:
+            fields = op.model_dump(include=UPDATE_FIELDS, exclude_none=True)
+        updated.append(op.card_id)
+        if fields:
+            board_id = cards[op.card_id].board_id
+            groups[board_id, tuple(sorted(fields.items()))].append(op.card_id)
+
+    # updated_at se actualiza solo (onupdate), igual que al editar una tarjeta
+    for (board_id, fields), ids in groups.items():
+        await db.execute(
+            update(Card)
+            .where(Card.id.in_(ids))
+            .values(**dict(fields), revision=revisions[board_id])
+            .execution_options(synchronize_session=False)
+        )
+
+    if deleted:
+        # Hijos primero: no dependemos de ON DELETE CASCADE en la BD
+        for child in (Label, Subtask, WorkLog):
+            await db.execute(
+                delete(child)
+                .where(child.card_id.in_(deleted))
+                .execution_options(synchronize_session=False)
+            )
+        await db.execute(
+            delete(Card)
+            .where(Card.id.in_(deleted))
+            .execution_options(synchronize_session=False)
+        )
+        for card_id in deleted:
+            board_id = cards[card_id].board_id
+            add_tombstones(db, board_id, revisions[board_id], "card", [card_id])
+
+    await db.commit()
+
+    # -----------------------------
+    # Informes afectados (mismas reglas que update_card / delete_card)
+    # -----------------------------
+    now = datetime.now(timezone.utc)
+    changed = {card_id: fields for (_, fields), ids in groups.items() for card_id in ids}
+    for card_id in deleted:
+        report_cache.invalidate_board(cards[card_id].board_id)
+    for card_id, fields in changed.items():
+        row, fields = cards[card_id], dict(fields)
+        report_cache.touch(
+            row.board_id,
+            [row.updated_at, row.due_date, now, fields.get("due_date")],
+            hours=False,
+        )
+        if "title" in fields or "list_id" in fields:
+            report_cache.invalidate_board(row.board_id, summary=False)
+
+    # Un evento por board y acción
+    for board_id, revision in revisions.items():
+        for action, ids in (("updated", updated), ("deleted", deleted)):
+            ids = [card_id for card_id in ids if cards[card_id].board_id == board_id]
+            if ids:
+                await publish_board_event(board_id, revision, "card", action, ids)
+
+    return {"updated": updated, "deleted": deleted}
+
+
 # ---------------------------------------------------------
 # LABELS
 # ---------------------------------------------------------
 @router.post("/{card_id}/labels", response_model=LabelOut)
-def create_label(
+async def create_label(
     card_id: int,
     payload: LabelCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
+    card = await access.card(card_id)
+    _, revision = await bump_card_revision(db, card.id)
 
-    label = Label(card_id=card.id, name=payload.name, color=payload.color)
+    label = Label(card_id=card.id, name=payload.name, color=payload.color, revision=revision)
     db.add(label)
-    db.commit()
-    db.refresh(label)
+    await db.commit()
+    await db.refresh(label)
+
+    await publish_board_event(card.board_id, revision, "label", "created", [label.id], card_id=card.id)
     return label
 
 
 @router.get("/{card_id}/labels", response_model=list[LabelOut])
-def list_labels(
+async def list_labels(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
-    return db.query(Label).filter(Label.card_id == card.id).all()
+    card = await access.card(card_id)
+    return (await db.scalars(select(Label).where(Label.card_id == card.id))).all()
 
 
 @extras_router.delete("/labels/{label_id}")
-def delete_label(
+@query_budget(6)
+async def delete_label(
     label_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    label = db.query(Label).filter(Label.id == label_id).first()
-    if not label:
-        raise HTTPException(status_code=404)
-    _assert_card_owner(label.card, current_user)
-    db.delete(label)
-    db.commit()
+    label = await access.label(label_id)
+    await db.delete(label)
+    board_id, revision = await bump_card_revision(db, label.card_id)
+    add_tombstones(db, board_id, revision, "label", [label.id])
+    await db.commit()
+
+    await publish_board_event(board_id, revision, "label", "deleted", [label.id], card_id=label.card_id)
     return {"message": "Etiqueta eliminada correctamente."}
 
 
@@ -341,63 +563,77 @@ def delete_label(
 # SUBTASKS
 # ---------------------------------------------------------
 @router.post("/{card_id}/subtasks", response_model=SubtaskOut)
-def create_subtask(
+async def create_subtask(
     card_id: int,
     payload: SubtaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
+    card = await access.card(card_id)
+    _, revision = await bump_card_revision(db, card.id)
 
-    subtask = Subtask(card_id=card.id, title=payload.title, completed=False)
+    subtask = Subtask(card_id=card.id, title=payload.title, completed=False, revision=revision)
     db.add(subtask)
-    db.commit()
-    db.refresh(subtask)
+    await add_card_subtasks(db, card.id, total=1)
+    await db.commit()
+    await db.refresh(subtask)
+
+    await publish_board_event(card.board_id, revision, "subtask", "created", [subtask.id], card_id=card.id)
     return subtask
 
 
 @router.get("/{card_id}/subtasks", response_model=list[SubtaskOut])
-def list_subtasks(
+async def list_subtasks(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    card = _get_card_or_404(card_id, db)
-    _assert_card_owner(card, current_user)
-    return db.query(Subtask).filter(Subtask.card_id == card.id).all()
+    card = await access.card(card_id)
+    return (await db.scalars(select(Subtask).where(Subtask.card_id == card.id))).all()
 
 
 @extras_router.patch("/subtasks/{subtask_id}", response_model=SubtaskOut)
-def update_subtask(
+@query_budget(7)
+async def update_subtask(
     subtask_id: int,
     payload: SubtaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    subtask = db.query(Subtask).filter(Subtask.id == subtask_id).first()
-    if not subtask:
-        raise HTTPException(status_code=404)
-    _assert_card_owner(subtask.card, current_user)
+    subtask = await access.subtask(subtask_id)
+    board_id, subtask.revision = await bump_card_revision(db, subtask.card_id)
 
+    was_completed = subtask.completed
     for field, value in payload.dict(exclude_unset=True).items():
         setattr(subtask, field, value)
 
-    db.commit()
-    db.refresh(subtask)
+    if subtask.completed != was_completed:
+        await add_card_subtasks(db, subtask.card_id, completed=1 if subtask.completed else -1)
+    await db.commit()
+    await db.refresh(subtask)
+
+    await publish_board_event(
+        board_id, subtask.revision, "subtask", "updated", [subtask.id], card_id=subtask.card_id
+    )
     return subtask
 
 
 @extras_router.delete("/subtasks/{subtask_id}")
-def delete_subtask(
+async def delete_subtask(
     subtask_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
-    subtask = db.query(Subtask).filter(Subtask.id == subtask_id).first()
-    if not subtask:
-        raise HTTPException(status_code=404)
-    _assert_card_owner(subtask.card, current_user)
-    db.delete(subtask)
-    db.commit()
+    subtask = await access.subtask(subtask_id)
+    await db.delete(subtask)
+    await add_card_subtasks(
+        db, subtask.card_id, total=-1, completed=-1 if subtask.completed else 0
+    )
+    board_id, revision = await bump_card_revision(db, subtask.card_id)
+    add_tombstones(db, board_id, revision, "subtask", [subtask.id])
+    await db.commit()
+
+    await publish_board_event(
+        board_id, revision, "subtask", "deleted", [subtask.id], card_id=subtask.card_id
+    )
     return {"message": "Subtarea eliminada correctamente."}
@@ -1,7 +1,9 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
+from backend.config import CARDS_BATCH_MAX
+
 
 # -------------------------------------------------------
 # CREAR tarjeta
@@ -32,6 +34,24 @@ class CardMove(BaseModel):
     order: int = Field(..., ge=0)
 
 
+# -------------------------------------------------------
+# OPERACIONES EN LOTE (POST /cards/batch)
+# -------------------------------------------------------
+# move: requiere list_id · update: mismos campos que CardUpdate · delete
+class CardBatchOperation(CardUpdate):
+    op: Literal["move", "update", "delete"]
+    card_id: int
+
+
+class CardBatchRequest(BaseModel):
+    operations: List[CardBatchOperation] = Field(..., min_length=1, max_length=CARDS_BATCH_MAX)
+
+
+class CardBatchResponse(BaseModel):
+    updated: List[int]
+    deleted: List[int]
+
+
 # -------------------------------------------------------
 # RESPUESTA
 # -------------------------------------------------------
@@ -95,3 +115,39 @@ class SubtaskOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+# -------------------------------------------------------
+# LISTADOS (GET /cards, /cards/search, snapshot, cambios)
+# -------------------------------------------------------
+# Documentan la respuesta en OpenAPI; las rutas devuelven FastJSONResponse
+# directamente, así que no se vuelve a validar cada tarjeta.
+class CardListItem(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    due_date: Optional[date]
+    board_id: int
+    list_id: int
+    user_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    total_hours: float
+    labels: List[LabelOut]
+    subtasks_total: int
+    subtasks_completed: int
+
+
+class CardSearchResult(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    due_date: Optional[date]
+    board_id: int
+    list_id: int
+    user_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    rank: float
+    title_highlight: str
+    snippet: Optional[str]
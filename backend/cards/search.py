@@ -0,0 +1,172 @@
+import html
+import re
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.cards.models import Card
+from backend.config import SEARCH_TS_CONFIG
+
+
+# =========================================================
+# ÍNDICE DE BÚSQUEDA DE TARJETAS
+# =========================================================
+# - PostgreSQL: columna generada cards.search_vector (tsvector) + índice GIN.
+# - SQLite: tabla virtual FTS5 cards_fts sincronizada con triggers.
+# Se crean en la migración 0002 (backend/migrations/versions).
+
+
+# =========================================================
+# CONSULTA DE BÚSQUEDA
+# =========================================================
+def _terms(query: str) -> list[str]:
+    # Solo palabras: evita inyectar operadores de tsquery/FTS5
+    return re.findall(r"\w+", query)
+
+
+# =========================================================
+# RESALTADO
+# =========================================================
+# La BD marca las coincidencias con dos caracteres de uso privado en lugar
+# de <mark>: el texto es del usuario, así que primero se escapa como HTML y
+# después se cambian los marcadores por las etiquetas. Así title_highlight y
+# snippet solo contienen texto escapado y <mark>...</mark> bien cerrados
+# (si el propio texto trae alguno de esos caracteres, se descarta).
+_START = "\ue000"
+_STOP = "\ue001"
+_MARKED = re.compile(f"{_START}([^{_START}{_STOP}]*){_STOP}")
+_SENTINELS = re.compile(f"[{_START}{_STOP}]")
+
+
+def _marked_to_html(text: str | None) -> str | None:
+    if text is None:
+        return None
+    text = _MARKED.sub(r"<mark>\1</mark>", html.escape(text))
+    return _SENTINELS.sub("", text)
+
+
+def _mark_literal(text: str | None, query: str) -> str | None:
+    # Resaltado en Python para la búsqueda parcial (ILIKE)
+    if text is None:
+        return None
+    text = _SENTINELS.sub("", text)
+    if not query:
+        return text
+    return re.sub(re.escape(query), lambda m: _START + m.group(0) + _STOP, text, flags=re.IGNORECASE)
+
+
+# Tabla virtual FTS5 (no es un modelo ORM)
+_cards_fts = table("cards_fts", column("rowid"))
+
+_CARD_COLUMNS = (
+    Card.id,
+    Card.title,
+    Card.description,
+    Card.due_date,
+    Card.board_id,
+    Card.list_id,
+    Card.user_id,
+    Card.created_at,
+    Card.updated_at,
+)
+
+
+async def search_board_cards(
+    db: AsyncSession,
+    board_id: int,
+    query: str,
+    responsible_id: int | None,
+    limit: int,
+    offset: int,
+) -> list[dict]:
+    """
+    Busca tarjetas del board por título/descripción, ordenadas por relevancia.
+    Cada término se trata como prefijo ("mun" encuentra "mundo"), igual que
+    la búsqueda parcial anterior. Devuelve el título resaltado y un fragmento
+    de la descripción, escapados como HTML y con las coincidencias entre
+    <mark>...</mark>.
+
+    Una consulta sin palabras (vacía o solo signos) no puede usar el índice:
+    se resuelve con la búsqueda parcial de antes, así que "" devuelve todas
+    las tarjetas del board.
+    """
+    terms = _terms(query)
+    # El dialecto de la sesión (no el del engine global): es el que ejecuta
+    dialect = db.get_bind().dialect.name if terms else None
+
+    if dialect == "postgresql":
+        ts_config = literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig")
+        ts_query = func.to_tsquery(ts_config, " & ".join(f"{t}:*" for t in terms))
+        search_vector = literal_column("cards.search_vector")
+        headline_opts = f"StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=10"
+        rank = func.ts_rank(search_vector, ts_query)
+        stmt = (
+            select(
+                *_CARD_COLUMNS,
+                rank.label("rank"),
+                func.ts_headline(
+                    ts_config, func.coalesce(Card.title, ""), ts_query, headline_opts
+                ).label("title_highlight"),
+                func.ts_headline(
+                    ts_config, func.coalesce(Card.description, ""), ts_query, headline_opts
+                ).label("snippet"),
+            )
+            .where(Card.board_id == board_id, search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), Card.id)
+        )
+    elif dialect == "sqlite":
+        match = " AND ".join('"' + t + '"*' for t in terms)
+        # bm25: menor es mejor; se invierte para devolver "más alto = mejor"
+        bm25 = literal_column("bm25(cards_fts, 10.0, 1.0)")
+        stmt = (
+            select(
+                *_CARD_COLUMNS,
+                (-bm25).label("rank"),
+                literal_column(f"highlight(cards_fts, 0, '{_START}', '{_STOP}')").label("title_highlight"),
+                literal_column(f"snippet(cards_fts, 1, '{_START}', '{_STOP}', '…', 12)").label("snippet"),
+            )
+            .select_from(Card)
+            .join(_cards_fts, _cards_fts.c.rowid == Card.id)
+            .where(Card.board_id == board_id, literal_column("cards_fts").op("MATCH")(match))
+            .order_by(bm25, Card.id)
+        )
+    else:
+        # Otros motores o consulta sin palabras: búsqueda parcial sin índice
+        # ni ranking; el resaltado se hace en Python
+        like_query = f"%{query}%"
+        stmt = (
+            select(*_CARD_COLUMNS, literal_column("0").label("rank"))
+            .where(
+                Card.board_id == board_id,
+                (Card.title.ilike(like_query)) | (Card.description.ilike(like_query)),
+            )
+            .order_by(Card.list_id, Card.id)
+        )
+
+    if responsible_id is not None:
+        stmt = stmt.where(Card.user_id == responsible_id)
+
+    rows = (await db.execute(stmt.limit(limit).offset(offset))).all()
+
+    indexed = dialect in ("postgresql", "sqlite")
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "due_date": row.due_date,
+            "board_id": row.board_id,
+            "list_id": row.list_id,
+            "user_id": row.user_id,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "rank": float(row.rank),
+            "title_highlight": _marked_to_html(
+                row.title_highlight if indexed else _mark_literal(row.title, query)
+            ),
+            "snippet": _marked_to_html(
+                row.snippet if indexed else _mark_literal(row.description, query)
+            ),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,87 @@
+import base64
+
+from backend.cards.models import Card, Label
+from backend.cards.rollups import HOURS_DECIMALS
+
+
+# =========================================================
+# CURSORES DE PAGINACIÓN (keyset sobre (list_id, id))
+# =========================================================
+def encode_cursor(list_id: int, card_id: int) -> str:
+    """
+    Convierte la última clave devuelta (list_id, id) en un cursor opaco
+    que el cliente reenvía para pedir la página siguiente.
+    """
+    raw = f"{list_id}:{card_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Inverso de encode_cursor. Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        list_id, card_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return int(list_id), int(card_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+# =========================================================
+# FILAS DE TARJETA PARA LOS LISTADOS (/cards, snapshot del board)
+# =========================================================
+# Se seleccionan columnas (no entidades) para no llenar el identity map
+CARD_ROW_COLUMNS = (
+    Card.id,
+    Card.title,
+    Card.description,
+    Card.due_date,
+    Card.board_id,
+    Card.list_id,
+    Card.user_id,
+    Card.created_at,
+    Card.updated_at,
+    Card.total_hours,
+    Card.subtasks_total,
+    Card.subtasks_completed,
+)
+
+LABEL_ROW_COLUMNS = (Label.id, Label.card_id, Label.name, Label.color)
+
+
+def group_labels(label_rows) -> dict[int, list[dict]]:
+    """
+    Agrupa filas de etiquetas (LABEL_ROW_COLUMNS) por card_id.
+    """
+    labels_by_card: dict[int, list[dict]] = {}
+    for lbl in label_rows:
+        labels_by_card.setdefault(lbl.card_id, []).append({
+            "id": lbl.id,
+            "card_id": lbl.card_id,
+            "name": lbl.name,
+            "color": lbl.color,
+        })
+    return labels_by_card
+
+
+def card_row_to_dict(card, labels: list[dict]) -> dict:
+    """
+    Fila de CARD_ROW_COLUMNS → dict de respuesta, con etiquetas, total de
+    horas y progreso de subtareas (columnas desnormalizadas de la tarjeta).
+    """
+    return {
+        "id": card.id,
+        "title": card.title,
+        "description": card.description,
+        "due_date": card.due_date,
+        "board_id": card.board_id,
+        "list_id": card.list_id,
+        "user_id": card.user_id,
+        "created_at": card.created_at,
+        "updated_at": card.updated_at,
+        "total_hours": round(float(card.total_hours), HOURS_DECIMALS),
+        "labels": labels,
+        "subtasks_total": card.subtasks_total,
+        "subtasks_completed": card.subtasks_completed,
+    }
@@ -1,3 +1,106 @@
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Capa de base de datos asíncrona (AsyncSession + driver async).
+# Con DB_ASYNC=0 las rutas siguen funcionando con la sesión síncrona clásica,
+# ejecutada en el threadpool de Starlette.
+DB_ASYNC = os.getenv("DB_ASYNC", "1") == "1"
+
+# Pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # segundos; -1 desactiva
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+# Modo compatible con PgBouncer en "transaction pooling":
+# sin sentencias preparadas del lado del servidor
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+# Muestra las consultas SQL en la consola (útil para depurar)
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+
+# Caché de usuarios autenticados (get_current_user sin consulta a BD)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "300"))   # segundos
+
+# Incluye email y fecha de alta en el JWT para resolver al usuario solo con el token.
+# Desactivado por defecto: la invalidación es local a cada proceso, así que con
+# varios workers un usuario borrado o modificado seguiría entrando con sus
+# claims. Activado, las claims solo se aceptan durante PRINCIPAL_CACHE_TTL
+# desde la emisión del token (el mismo margen que la caché de principals).
+TOKEN_EMBED_CLAIMS = os.getenv("TOKEN_EMBED_CLAIMS", "0") == "1"
+
+# Caché de dueños de boards para las comprobaciones de acceso
+BOARD_OWNER_CACHE_SIZE = int(os.getenv("BOARD_OWNER_CACHE_SIZE", "50000"))
+
+# Paginación de GET /cards (sin `limit` se devuelve una página de CARDS_PAGE_DEFAULT_LIMIT)
+CARDS_PAGE_DEFAULT_LIMIT = int(os.getenv("CARDS_PAGE_DEFAULT_LIMIT", "100"))
+CARDS_PAGE_MAX_LIMIT = int(os.getenv("CARDS_PAGE_MAX_LIMIT", "500"))
+CARDS_STREAM_BATCH = int(os.getenv("CARDS_STREAM_BATCH", "500"))
+
+# Configuración de texto de PostgreSQL para la búsqueda de tarjetas
+SEARCH_TS_CONFIG = os.getenv("SEARCH_TS_CONFIG", "spanish")
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "200"))
+
+# Aplica las migraciones pendientes al arrancar la app.
+# En despliegue se recomienda 0 y ejecutar: python -m backend.migrations upgrade
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+
+# Caché de informes semanales (/report/...)
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "5000"))
+REPORT_CACHE_CURRENT_TTL = float(os.getenv("REPORT_CACHE_CURRENT_TTL", "60"))   # segundos
+
+# Máximo de worklogs por petición en POST /worklogs/batch
+WORKLOG_BATCH_MAX = int(os.getenv("WORKLOG_BATCH_MAX", "500"))
+
+# Máximo de operaciones por petición en POST /cards/batch
+CARDS_BATCH_MAX = int(os.getenv("CARDS_BATCH_MAX", "500"))
+
+# Eventos en tiempo real (/ws/boards/{id}): "memory" para un solo worker,
+# "postgres" (LISTEN/NOTIFY sobre DATABASE_URL) para varios workers
+REALTIME_BROKER = os.getenv("REALTIME_BROKER", "memory")
+REALTIME_CHANNEL = os.getenv("REALTIME_CHANNEL", "board_events")
+# Eventos pendientes por conexión antes de pedir al cliente que resincronice
+REALTIME_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", "256"))
+# Cada cuántos segundos se vuelve a comprobar el token y el acceso al board de
+# una conexión abierta (además, se cierra al caducar el token)
+REALTIME_AUTH_RECHECK = float(os.getenv("REALTIME_AUTH_RECHECK", "60"))
+
+# Hash de contraseñas (bcrypt) en un pool de procesos aparte.
+# PASSWORD_HASH_WORKERS=0 lo ejecuta en el threadpool del servidor.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Operaciones en cola o en curso antes de responder 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+# Coste de bcrypt; al subirlo, los hashes antiguos se rehacen en el login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Duración de los tokens: access token (JWT, minutos) y refresh token
+# rotatorio (días, se renueva en cada POST /auth/refresh)
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Sentencias SQL y tiempo de BD por petición (backend/querystats.py).
+# Con 1 se devuelven en cabeceras X-DB-Queries / X-DB-Time-Ms (solo depuración).
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "0") == "1"
+# Repeticiones de una misma sentencia en una petición para avisar de un posible N+1
+QUERY_REPEAT_WARN = int(os.getenv("QUERY_REPEAT_WARN", "10"))
+
+# Métricas Prometheus en GET /metrics (por proceso: con varios workers, raspar cada uno)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Registro de consultas lentas (GET /admin/slow-queries). SLOW_QUERY_MS <= 0 lo desactiva.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+# Guarda los valores de los parámetros tal cual (emails, hashes...). Por defecto
+# solo se guarda su tipo y longitud; activar solo para depurar.
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "0") == "1"
+# Fracción de consultas lentas (solo SELECT) de las que se captura el plan; 0 = nunca
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0"))
+# En PostgreSQL: EXPLAIN (ANALYZE, BUFFERS), que vuelve a ejecutar la consulta
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "1") == "1"
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+
+# Token de los endpoints /admin (cabecera X-Admin-Token). Vacío = desactivados.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
@@ -1,20 +1,63 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import (
+    DATABASE_URL,
+    DB_ASYNC,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_PGBOUNCER,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
+from backend.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from backend.querystats import instrument_engine
+from backend.slowlog import slow_query_log
 
-from backend.config import DATABASE_URL
+
+def _engine_kwargs(url, poolclass) -> dict:
+    """
+    Parámetros comunes de los motores sync y async, leídos de config.
+    """
+    kwargs = {
+        "echo": DB_ECHO,
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    # PgBouncer (transaction pooling) no admite sentencias preparadas:
+    # psycopg 3 las desactiva con prepare_threshold=None
+    if DB_PGBOUNCER and make_url(url).drivername == "postgresql+psycopg":
+        kwargs["connect_args"] = {"prepare_threshold": None}
+    return kwargs
 
 
 # Crea el motor de conexión a PostgreSQL
 engine = create_engine(
     DATABASE_URL,
-    echo=True,       # Muestra las consultas SQL en la consola (útil para aprender). Pon False si molesta.
     future=True,
+    **_engine_kwargs(DATABASE_URL, InstrumentedQueuePool),
 )
 
+# Sentencias y tiempo de BD por petición + registro de consultas lentas
+instrument_engine(engine)
+slow_query_log.attach(engine, explain_engine=engine)
+
 # Crea la fábrica de sesiones
+# (expire_on_commit=False como AsyncSessionLocal: los objetos siguen
+# legibles tras el commit sin volver a consultar la BD)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
 )
 
@@ -22,10 +65,120 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
-# Dependencia para obtener una sesión de BD en cada petición
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _async_url(url: str):
+    """
+    Traduce la URL síncrona a su equivalente con driver asíncrono:
+    - postgresql / postgresql+psycopg2 → postgresql+psycopg (psycopg 3)
+    - sqlite → sqlite+aiosqlite
+    """
+    url = make_url(url)
+    if url.drivername in ("postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+psycopg")
+    elif url.drivername in ("sqlite", "sqlite+pysqlite"):
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+# Motor y sesiones asíncronas (solo si DB_ASYNC está activo)
+async_engine = (
+    create_async_engine(
+        _async_url(DATABASE_URL),
+        **_engine_kwargs(_async_url(DATABASE_URL), InstrumentedAsyncQueuePool),
+    )
+    if DB_ASYNC
+    else None
+)
+
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+    slow_query_log.attach(async_engine.sync_engine)
+
+# expire_on_commit=False: tras el commit los objetos siguen legibles
+# sin lanzar una carga perezosa (no permitida fuera de un await)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if DB_ASYNC
+    else None
+)
+
+
+class _AsyncRows:
+    # Iteración async sobre un Result síncrono (equivalente mínimo de AsyncResult)
+    def __init__(self, result):
+        self._result = result
+
+    async def __aiter__(self):
+        for row in self._result:
+            yield row
+
+
+class ThreadedSession:
+    """
+    Adaptador con la misma interfaz que AsyncSession pero respaldado por una
+    Session síncrona. Cada operación bloqueante se ejecuta en el threadpool,
+    así las rutas async siguen funcionando con DB_ASYNC=0.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+        return _AsyncRows(result)
+
+    async def scalars(self, *args, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+        return result.scalars()
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+# Dependencia para obtener una sesión de BD en cada petición.
+# Con DB_ASYNC=1 entrega una AsyncSession; con DB_ASYNC=0 una ThreadedSession.
+async def get_db():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = ThreadedSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.database import get_db
+from backend.auth.cache import Principal
 from backend.auth.utils import get_current_user
-from backend.models import List, User
+from backend.boards.revisions import etag_matches, make_etag, not_modified
+from backend.models import Board, List
 
 router = APIRouter(
     prefix="/lists",
@@ -12,15 +15,26 @@ router = APIRouter(
 
 
 @router.get("/")
-def list_lists(
+async def list_lists(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
+    # ETag con la revisión del board (si existe)
+    revision = await db.scalar(select(Board.revision).where(Board.id == board_id))
+    if revision is not None:
+        etag = make_etag("lists", board_id, revision)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
     lists = (
-        db.query(List)
-        .filter(List.board_id == board_id)
-        .order_by(List.order)
-        .all()
-    )
+        await db.scalars(
+            select(List)
+            .where(List.board_id == board_id)
+            .order_by(List.order)
+        )
+    ).all()
     return lists
@@ -1,19 +1,52 @@
-from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.database import get_db, engine, Base
+from backend.config import DB_AUTO_MIGRATE, METRICS_ENABLED
+from backend.database import get_db, engine, async_engine
+from backend.metrics import MetricsMiddleware, metrics_response
+from backend.migrations import upgrade
+from backend.pool import pool_status
+from backend.querystats import QueryStatsMiddleware
 from backend import models
 
+from backend.admin.routes import router as admin_router
 from backend.auth.routes import router as auth_router
 from backend.boards.routes import router as boards_router
 from backend.cards.routes import router as cards_router, extras_router as cards_extras_router
 from backend.worklogs.routes import router as worklogs_router
 from backend.lists.routes import router as lists_router
 from backend.reportsweek.routes import router as reports_router
+from backend.auth.passwords import password_hasher
+from backend.realtime.broker import broker
+from backend.realtime.routes import router as realtime_router
+from backend.serialization import FastJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Broker de eventos en tiempo real (LISTEN en el modo "postgres")
+    await broker.start()
+    yield
+    await broker.stop()
+    # Procesos del hash de contraseñas
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
 
-app = FastAPI()
+# 422 con el mismo cuerpo que el de FastAPI, pero codificado con
+# serialization.dumps: si la entrada rechazada es NaN o Infinity (JSON los
+# admite al leer), el json estándar falla al devolverla y la respuesta sería 500
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return FastJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
 
 origins = ["*"]
 
@@ -23,9 +56,20 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-DB-Queries", "X-DB-Time-Ms"],
 )
 
-Base.metadata.create_all(bind=engine)
+# Métricas por ruta. Se añade antes que QueryStatsMiddleware para quedar
+# por dentro (el último añadido es el más externo) y leer su QueryStats.
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Sentencias SQL por petición: presupuestos por ruta y aviso de N+1
+app.add_middleware(QueryStatsMiddleware)
+
+# Esquema gestionado con migraciones versionadas (backend/migrations)
+if DB_AUTO_MIGRATE:
+    upgrade(engine)
 
 app.include_router(auth_router)
 app.include_router(boards_router)
@@ -34,8 +78,26 @@ app.include_router(cards_extras_router)
 app.include_router(worklogs_router)
 app.include_router(lists_router)
 app.include_router(reports_router)
+app.include_router(realtime_router)
+app.include_router(admin_router)
 
 @app.get("/ping")
-def db_ping(db: Session = Depends(get_db)):
-    db.execute(text("SELECT 1"))
+async def db_ping(db: AsyncSession = Depends(get_db)):
+    await db.execute(text("SELECT 1"))
     return {"message": "Database connection OK"}
+
+
+# Estado del pool de conexiones (saturación, esperas y timeouts)
+@app.get("/ping/pool")
+async def db_pool_stats():
+    stats = {"sync": pool_status(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = pool_status(async_engine.pool)
+    return stats
+
+
+# Métricas en formato de texto de Prometheus (ver backend/metrics.py)
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return metrics_response()
@@ -0,0 +1,206 @@
+import bisect
+import threading
+import time
+
+from fastapi.responses import Response
+
+from backend.querystats import current_stats
+
+
+# =============================
+# Métricas en formato de texto de Prometheus
+# =============================
+# Implementación mínima (contadores, gauges e histogramas con etiquetas)
+# para no depender de prometheus_client. Los valores son de este proceso:
+# con varios workers, Prometheus debe raspar cada uno o agregarlos.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in items
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels → [cuentas por bucket (no acumuladas)..., +Inf, suma]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+REQUESTS = Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status")
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Duración de la petición, cuerpo incluido", ROUTE_LABELS
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Peticiones HTTP en curso")
+DB_SECONDS = Counter(
+    "http_request_db_seconds_total",
+    "Tiempo de BD dentro de las peticiones (comparar con http_request_duration_seconds_sum)",
+    ROUTE_LABELS,
+)
+DB_STATEMENTS = Counter(
+    "http_request_db_statements_total", "Sentencias SQL ejecutadas por las peticiones", ROUTE_LABELS
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Tamaño del cuerpo de la petición", ROUTE_LABELS, SIZE_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de la respuesta", ROUTE_LABELS, SIZE_BUCKETS
+)
+
+METRICS = (REQUESTS, LATENCY, IN_FLIGHT, DB_SECONDS, DB_STATEMENTS, REQUEST_SIZE, RESPONSE_SIZE)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response() -> Response:
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
+# =============================
+# Middleware ASGI
+# =============================
+
+class MetricsMiddleware:
+    """
+    Registra cada petición HTTP con la plantilla de su ruta como etiqueta
+    (/cards/{card_id}, no el id concreto); lo que no casa con ninguna ruta
+    va a "unmatched" para no disparar la cardinalidad.
+
+    El tiempo y las sentencias de BD salen del QueryStats de la petición:
+    este middleware debe ir por dentro de QueryStatsMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def receive_counting():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_counting(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive_counting, send_counting)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+
+            REQUESTS.inc(labels + (str(status),))
+            LATENCY.observe(labels, time.perf_counter() - started)
+            REQUEST_SIZE.observe(labels, request_bytes)
+            RESPONSE_SIZE.observe(labels, response_bytes)
+
+            stats = current_stats()
+            if stats is not None:
+                DB_SECONDS.inc(labels, stats.db_time)
+                DB_STATEMENTS.inc(labels, stats.statements)
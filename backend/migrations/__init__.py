@@ -0,0 +1 @@
+from .runner import applied_versions, find_unindexed_foreign_keys, pending_revisions, upgrade
@@ -0,0 +1,43 @@
+import sys
+
+from backend.database import engine
+from backend.migrations.runner import (
+    applied_versions,
+    find_unindexed_foreign_keys,
+    load_revisions,
+    upgrade,
+)
+
+
+# =========================================================
+# python -m backend.migrations [upgrade|status|check]
+# =========================================================
+def main(command: str) -> int:
+    if command == "upgrade":
+        applied = upgrade(engine)
+        print(f"Aplicadas: {', '.join(applied)}" if applied else "Base de datos al día")
+        return 0
+
+    if command == "status":
+        with engine.begin() as conn:
+            applied = applied_versions(conn)
+        for mod in load_revisions():
+            mark = "x" if mod.revision in applied else " "
+            print(f"[{mark}] {mod.revision}  {mod.description}")
+        return 0
+
+    if command == "check":
+        with engine.connect() as conn:
+            missing = find_unindexed_foreign_keys(conn)
+        for table, columns in missing:
+            print(f"Clave foránea sin índice: {table}({', '.join(columns)})")
+        if not missing:
+            print("Todas las claves foráneas tienen índice")
+        return 1 if missing else 0
+
+    print("Uso: python -m backend.migrations [upgrade|status|check]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
@@ -0,0 +1,116 @@
+import importlib
+import pkgutil
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+
+
+# =========================================================
+# MIGRACIONES VERSIONADAS
+# =========================================================
+# Cada revisión es un módulo de backend/migrations/versions con:
+#   revision = "0001"        (orden de aplicación)
+#   description = "..."
+#   def upgrade(connection): ...
+# Las revisiones aplicadas se anotan en la tabla schema_migrations.
+
+VERSIONS_PACKAGE = "backend.migrations.versions"
+
+# Clave del advisory lock de PostgreSQL (evita que dos workers migren a la vez)
+_PG_LOCK_KEY = 724_310_001
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(32), primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def load_revisions() -> list:
+    """
+    Importa todas las revisiones y las devuelve ordenadas por `revision`.
+    """
+    package = importlib.import_module(VERSIONS_PACKAGE)
+    revisions = [
+        importlib.import_module(f"{VERSIONS_PACKAGE}.{name}")
+        for _, name, _ in pkgutil.iter_modules(package.__path__)
+    ]
+    revisions.sort(key=lambda mod: mod.revision)
+
+    seen = set()
+    for mod in revisions:
+        if mod.revision in seen:
+            raise RuntimeError(f"Duplicated migration revision {mod.revision}")
+        seen.add(mod.revision)
+    return revisions
+
+
+def applied_versions(connection) -> set[str]:
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_revisions(engine) -> list:
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [mod for mod in load_revisions() if mod.revision not in applied]
+
+
+def upgrade(engine) -> list[str]:
+    """
+    Aplica las revisiones pendientes, cada una en su propia transacción.
+    Devuelve las versiones aplicadas. Si ya está al día solo cuesta una
+    consulta a schema_migrations.
+    """
+    applied_now = []
+    for mod in pending_revisions(engine):
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+                # Otro worker pudo aplicarla mientras esperábamos el lock
+                if mod.revision in applied_versions(conn):
+                    continue
+            mod.upgrade(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=mod.revision,
+                    description=mod.description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+        applied_now.append(mod.revision)
+    return applied_now
+
+
+# =========================================================
+# COMPROBACIÓN: claves foráneas sin índice
+# =========================================================
+def find_unindexed_foreign_keys(connection) -> list[tuple[str, list[str]]]:
+    """
+    Devuelve (tabla, columnas) de cada clave foránea cuyas columnas no son
+    prefijo de ningún índice, clave primaria o restricción única.
+    Sin ese índice, los JOIN y los borrados en cascada recorren la tabla entera.
+    """
+    inspector = inspect(connection)
+    missing = []
+
+    for table in inspector.get_table_names():
+        if table == schema_migrations.name:
+            continue
+
+        prefixes = [idx["column_names"] for idx in inspector.get_indexes(table)]
+        prefixes += [uc["column_names"] for uc in inspector.get_unique_constraints(table)]
+        pk = inspector.get_pk_constraint(table)["constrained_columns"]
+        if pk:
+            prefixes.append(pk)
+
+        for fk in inspector.get_foreign_keys(table):
+            cols = fk["constrained_columns"]
+            if not any(p[:len(cols)] == cols for p in prefixes):
+                missing.append((table, cols))
+
+    return missing
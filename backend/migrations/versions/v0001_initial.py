@@ -0,0 +1,90 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+)
+
+revision = "0001"
+description = "Esquema inicial (tablas creadas antes con create_all)"
+
+
+# Copia congelada del esquema original: no debe cambiar aunque cambien los modelos
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("password_hash", String, nullable=False),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "boards", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+)
+
+Table(
+    "lists", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("board_id", Integer, ForeignKey("boards.id"), nullable=False),
+    Column("name", String, nullable=False),
+    Column("order", Integer, nullable=False),
+)
+
+Table(
+    "cards", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("board_id", Integer, ForeignKey("boards.id"), nullable=False),
+    Column("list_id", Integer, ForeignKey("lists.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("title", String(80), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("due_date", Date, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+Table(
+    "labels", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("card_id", Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False),
+    Column("name", String(30), nullable=False),
+    Column("color", String(20), nullable=False),
+)
+
+Table(
+    "subtasks", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("card_id", Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False),
+    Column("title", String(100), nullable=False),
+    Column("completed", Boolean, nullable=False),
+)
+
+Table(
+    "worklogs", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("card_id", Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("date", Date, nullable=False),
+    Column("hours", Float, nullable=False),
+    Column("note", String(200), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def upgrade(connection):
+    # checkfirst: las bases existentes ya tienen estas tablas
+    metadata.create_all(connection, checkfirst=True)
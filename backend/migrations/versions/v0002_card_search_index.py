@@ -0,0 +1,73 @@
+from sqlalchemy import text
+
+from backend.config import SEARCH_TS_CONFIG
+
+revision = "0002"
+description = "Índice de búsqueda de tarjetas (tsvector/GIN o FTS5)"
+
+
+# =========================================================
+# ÍNDICE DE BÚSQUEDA DE TARJETAS
+# =========================================================
+# - PostgreSQL: columna generada cards.search_vector (tsvector) + índice GIN.
+#   Al ser GENERATED ... STORED, PostgreSQL la recalcula en cada escritura.
+# - SQLite: tabla virtual FTS5 cards_fts (external content sobre cards)
+#   sincronizada con triggers de insert/update/delete.
+# Ambos objetos se crean fuera del modelo ORM porque dependen del dialecto.
+
+_PG_DDL = [
+    f"""
+    ALTER TABLE cards ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_cards_search_vector ON cards USING GIN (search_vector)",
+]
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+        title, description,
+        content='cards', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO cards_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE OF title, description ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO cards_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def upgrade(connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for ddl in _PG_DDL:
+            connection.execute(text(ddl))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'cards_fts'")
+        ).first()
+        for ddl in _SQLITE_DDL:
+            connection.execute(text(ddl))
+        if not exists:
+            # Indexa las tarjetas que ya existían antes de crear la tabla FTS
+            connection.execute(text("INSERT INTO cards_fts(cards_fts) VALUES ('rebuild')"))
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect, text
+
+revision = "0003"
+description = "Totales desnormalizados en cards (horas y subtareas)"
+
+
+def upgrade(connection):
+    # Las bases creadas antes con create_all pueden tener ya alguna columna
+    existing = {col["name"] for col in inspect(connection).get_columns("cards")}
+
+    if "total_hours" not in existing:
+        connection.execute(
+            text("ALTER TABLE cards ADD COLUMN total_hours FLOAT NOT NULL DEFAULT 0")
+        )
+    for name in ("subtasks_total", "subtasks_completed"):
+        if name not in existing:
+            connection.execute(
+                text(f"ALTER TABLE cards ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+            )
+
+    # Relleno inicial a partir de worklogs y subtasks
+    connection.execute(text("""
+        UPDATE cards SET
+            total_hours = COALESCE(
+                (SELECT SUM(hours) FROM worklogs WHERE worklogs.card_id = cards.id), 0
+            ),
+            subtasks_total = (
+                SELECT COUNT(*) FROM subtasks WHERE subtasks.card_id = cards.id
+            ),
+            subtasks_completed = (
+                SELECT COUNT(*) FROM subtasks
+                WHERE subtasks.card_id = cards.id AND subtasks.completed
+            )
+    """))
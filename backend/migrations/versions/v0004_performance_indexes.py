@@ -0,0 +1,30 @@
+from sqlalchemy import Index, MetaData, Table
+
+revision = "0004"
+description = "Índices de claves foráneas y compuestos para las consultas frecuentes"
+
+
+# (nombre, tabla, columnas)
+INDEXES = [
+    # Claves foráneas sin índice
+    ("ix_boards_user_id", "boards", ["user_id"]),
+    ("ix_lists_board_id", "lists", ["board_id"]),
+    ("ix_cards_list_id", "cards", ["list_id"]),
+    ("ix_cards_user_id", "cards", ["user_id"]),
+    ("ix_labels_card_id", "labels", ["card_id"]),
+    ("ix_subtasks_card_id", "subtasks", ["card_id"]),
+    # GET /cards: filtro por board y orden keyset (list_id, id);
+    # también cubre la clave foránea cards.board_id
+    ("ix_cards_board_id_list_id_id", "cards", ["board_id", "list_id", "id"]),
+    # "Mis horas" (user_id + rango de fechas); cubre worklogs.user_id
+    ("ix_worklogs_user_id_date", "worklogs", ["user_id", "date"]),
+    # Horas por tarjeta en una semana; cubre worklogs.card_id
+    ("ix_worklogs_card_id_date", "worklogs", ["card_id", "date"]),
+]
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    for name, table_name, columns in INDEXES:
+        table = Table(table_name, metadata, autoload_with=connection, extend_existing=True)
+        Index(name, *(table.c[col] for col in columns)).create(connection, checkfirst=True)
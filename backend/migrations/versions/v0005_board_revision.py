@@ -0,0 +1,12 @@
+from sqlalchemy import inspect, text
+
+revision = "0005"
+description = "Contador de revisión por board (ETag)"
+
+
+def upgrade(connection):
+    existing = {col["name"] for col in inspect(connection).get_columns("boards")}
+    if "revision" not in existing:
+        connection.execute(
+            text("ALTER TABLE boards ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        )
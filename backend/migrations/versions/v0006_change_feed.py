@@ -0,0 +1,51 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table, inspect, text
+
+revision = "0006"
+description = "Revisión por fila y tombstones para el feed de cambios"
+
+
+def _tombstones_table(connection) -> Table:
+    metadata = MetaData()
+    # La clave foránea necesita boards en la misma MetaData
+    Table("boards", metadata, autoload_with=connection)
+    return Table(
+        "tombstones", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("board_id", Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False),
+        Column("entity", String(20), nullable=False),
+        Column("entity_id", Integer, nullable=False),
+        Column("revision", Integer, nullable=False),
+        Index("ix_tombstones_board_id_revision", "board_id", "revision"),
+    )
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table in ("cards", "labels", "subtasks", "worklogs"):
+        existing = {col["name"] for col in inspector.get_columns(table)}
+        if "revision" not in existing:
+            connection.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            )
+
+    _tombstones_table(connection).create(connection, checkfirst=True)
+
+    cards = Table("cards", MetaData(), autoload_with=connection)
+    Index("ix_cards_board_id_revision", cards.c.board_id, cards.c.revision).create(
+        connection, checkfirst=True
+    )
+
+    # Las filas existentes entran en una nueva revisión de su board, para que
+    # un cliente que empieza desde cero (since=0) las reciba todas
+    connection.execute(text("UPDATE boards SET revision = revision + 1"))
+    connection.execute(text("""
+        UPDATE cards SET revision = (
+            SELECT boards.revision FROM boards WHERE boards.id = cards.board_id
+        )
+    """))
+    for table in ("labels", "subtasks", "worklogs"):
+        connection.execute(text(f"""
+            UPDATE {table} SET revision = (
+                SELECT cards.revision FROM cards WHERE cards.id = {table}.card_id
+            )
+        """))
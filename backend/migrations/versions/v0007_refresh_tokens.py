@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+
+revision = "0007"
+description = "Refresh tokens rotatorios"
+
+
+def _refresh_tokens_table(connection) -> Table:
+    metadata = MetaData()
+    # La clave foránea necesita users en la misma MetaData
+    Table("users", metadata, autoload_with=connection)
+    return Table(
+        "refresh_tokens", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        Column("token_hash", String(64), nullable=False, unique=True),
+        Column("family_id", String(32), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Column("revoked_at", DateTime, nullable=True),
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+    )
+
+
+def upgrade(connection):
+    _refresh_tokens_table(connection).create(connection, checkfirst=True)
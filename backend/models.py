@@ -26,7 +26,9 @@ class Board(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Se incrementa con cada cambio del contenido (ver boards/revisions.py)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relaciones ORM para enlazar con usuario, listas y tarjetas
     owner = relationship("User", back_populates="boards")
@@ -39,7 +41,7 @@ class List(Base):
     __tablename__ = "lists"
 
     id = Column(Integer, primary_key=True, index=True)
-    board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
+    board_id = Column(Integer, ForeignKey("boards.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     order = Column(Integer, nullable=False)
 
@@ -0,0 +1,198 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from backend.config import QUERY_REPEAT_WARN, QUERY_STATS_HEADERS
+
+logger = logging.getLogger("backend.querystats")
+
+
+# =============================
+# Estadísticas de SQL por petición
+# =============================
+
+class QueryStats:
+    """
+    Sentencias ejecutadas y tiempo de BD acumulado durante una petición.
+    `repeated` cuenta cuántas veces aparece cada texto SQL: la misma
+    sentencia muchas veces con distintos parámetros es la firma de un N+1.
+    """
+
+    __slots__ = ("statements", "db_time", "repeated", "scope")
+
+    def __init__(self, scope=None):
+        self.statements = 0
+        self.db_time = 0.0
+        self.repeated: Counter[str] = Counter()
+        # Scope ASGI de la petición (para saber la ruta)
+        self.scope = scope
+
+    def route(self) -> str | None:
+        """
+        "MÉTODO /plantilla/{de_ruta}"; antes del enrutado, la ruta literal.
+        """
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_time += seconds
+        self.repeated[statement] += 1
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        if not self.repeated:
+            return None
+        return self.repeated.most_common(1)[0]
+
+
+# Estadísticas de la petición en curso (None fuera de una petición).
+# El objeto es mutable: los hilos del threadpool (DB_ASYNC=0) y los greenlets
+# de AsyncSession reciben una copia del contexto, pero apuntan al mismo objeto.
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def instrument_engine(engine):
+    """
+    Engancha before/after_cursor_execute al motor (el síncrono; para uno
+    async, su .sync_engine). Fuera de una petición no hace nada más que
+    leer la ContextVar.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None and context is not None:
+            stats.record(statement, time.perf_counter() - context._query_started)
+
+
+# =============================
+# Presupuesto de consultas por ruta
+# =============================
+
+def query_budget(max_statements: int):
+    """
+    Declara cuántas sentencias SQL puede ejecutar como máximo una ruta.
+    Se aplica debajo del decorador del router:
+
+        @router.get("/{board_id}/snapshot")
+        @query_budget(5)
+        async def get_board_snapshot(...):
+
+    El middleware avisa en el log si se supera; python -m
+    backend.benchmarks.budgets (CI) lo convierte en un fallo con
+    assert_query_budget. Cada ruta con presupuesto debe figurar en su CHECKS.
+    """
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_statements
+        return endpoint
+    return decorator
+
+
+def budget_for(scope) -> int | None:
+    return getattr(scope.get("endpoint"), "__query_budget__", None)
+
+
+# =============================
+# Middleware ASGI
+# =============================
+
+class QueryStatsMiddleware:
+    """
+    Abre un QueryStats por petición HTTP.
+
+    - Con QUERY_STATS_HEADERS (depuración) añade X-DB-Queries, X-DB-Time-Ms
+      y, si la ruta declara presupuesto, X-DB-Query-Budget. En respuestas en
+      streaming solo incluyen lo ejecutado antes de enviar las cabeceras.
+    - Al terminar la petición (cuerpo incluido) avisa en el log si se superó
+      el presupuesto o si una sentencia se repitió QUERY_REPEAT_WARN veces.
+    """
+
+    def __init__(self, app, headers: bool = QUERY_STATS_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if self.headers and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.statements).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.db_time * 1000:.2f}".encode()))
+                budget = budget_for(scope)
+                if budget is not None:
+                    headers.append((b"x-db-query-budget", str(budget).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            self._check(scope, stats)
+
+    @staticmethod
+    def _check(scope, stats: QueryStats):
+        route = stats.route()
+
+        budget = budget_for(scope)
+        if budget is not None and stats.statements > budget:
+            logger.warning(
+                "%s: %d sentencias SQL (presupuesto %d)", route, stats.statements, budget
+            )
+
+        top = stats.most_repeated()
+        if top is not None and top[1] >= QUERY_REPEAT_WARN:
+            statement, count = top
+            logger.warning(
+                "%s: posible N+1, la misma sentencia se ejecutó %d veces: %s",
+                route, count, " ".join(statement.split())[:200],
+            )
+
+
+# =============================
+# Ayuda para tests
+# =============================
+
+def assert_query_budget(response, max_statements: int | None = None):
+    """
+    Comprueba con las cabeceras de depuración que la petición no superó
+    `max_statements` o, si no se indica, el presupuesto de su ruta.
+    Requiere la app con QUERY_STATS_HEADERS=1 (ver backend/benchmarks/budgets.py).
+
+        response = client.get(f"/boards/{board_id}/snapshot", headers=auth)
+        assert_query_budget(response)
+    """
+    if "x-db-queries" not in response.headers:
+        raise AssertionError("Sin cabecera X-DB-Queries: arranca la app con QUERY_STATS_HEADERS=1")
+
+    used = int(response.headers["x-db-queries"])
+    if max_statements is None:
+        if "x-db-query-budget" not in response.headers:
+            raise AssertionError("La ruta no declara presupuesto (@query_budget)")
+        max_statements = int(response.headers["x-db-query-budget"])
+
+    if used > max_statements:
+        raise AssertionError(
+            f"{response.request.method} {response.request.url.path}: "
+            f"{used} sentencias SQL, presupuesto {max_statements}"
+        )
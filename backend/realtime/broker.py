@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+
+from sqlalchemy.engine import make_url
+
+from backend.config import DATABASE_URL, REALTIME_BROKER, REALTIME_CHANNEL, REALTIME_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# DIFUSIÓN DE EVENTOS DE BOARD
+# =========================================================
+# Las rutas publican un evento por escritura confirmada:
+#   {"board_id", "revision", "entity", "action", "ids", "card_id"}
+# y cada WebSocket suscrito al board lo recibe. El evento es ligero: el
+# cliente puede pedir el detalle a /boards/{id}/changes?since=<revision>.
+#
+# - InProcessBroker: reparto en memoria (un solo worker).
+# - PostgresBroker: NOTIFY al publicar y LISTEN en cada worker, que reparte
+#   en memoria a sus propias conexiones.
+
+
+class Subscription:
+    """
+    Cola acotada de una conexión. Si el cliente no da abasto se marca como
+    desbordada y se le pide resincronizar en vez de acumular memoria.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Hueco garantizado: se vacía la cola y solo queda la orden de resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class InProcessBroker:
+    def __init__(self, queue_size: int = REALTIME_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @asynccontextmanager
+    async def subscribe(self, board_id: int):
+        subscription = Subscription(self.queue_size)
+        self._subscribers.setdefault(board_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[board_id]
+
+    def deliver(self, board_id: int, event: dict):
+        """
+        Reparte un evento a las conexiones locales del board.
+        """
+        for subscription in list(self._subscribers.get(board_id, ())):
+            subscription.push(event)
+
+    def deliver_all(self, event: dict):
+        for board_id in list(self._subscribers):
+            self.deliver(board_id, event)
+
+    async def publish(self, board_id: int, event: dict):
+        self.deliver(board_id, event)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Fan-out entre workers con LISTEN/NOTIFY. Usa dos conexiones psycopg
+    propias (fuera del pool): una escucha y otra publica.
+    Si la escucha se corta, reconecta y manda "resync" a las conexiones
+    locales, porque los eventos de ese intervalo se han perdido.
+    """
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, database_url: str, channel: str, queue_size: int = REALTIME_QUEUE_SIZE):
+        super().__init__(queue_size)
+        # psycopg espera un conninfo libpq, sin el "+driver" de SQLAlchemy
+        self.conninfo = make_url(database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.channel = channel
+        self._listener = None
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def _connect(self):
+        import psycopg
+
+        return await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True)
+
+    async def _listen_forever(self):
+        from psycopg import sql
+
+        first = True
+        while True:
+            try:
+                self._listener = await self._connect()
+                await self._listener.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                if not first:
+                    self.deliver_all({"type": "resync"})
+                first = False
+                async for notify in self._listener.notifies():
+                    try:
+                        event = json.loads(notify.payload)
+                        self.deliver(event["board_id"], event)
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed board event: %r", notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN %s connection lost; reconnecting", self.channel)
+                await asyncio.sleep(self.RECONNECT_DELAY)
+            finally:
+                if self._listener is not None:
+                    await self._listener.close()
+                    self._listener = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._publisher is not None:
+            await self._publisher.close()
+            self._publisher = None
+
+    async def publish(self, board_id: int, event: dict):
+        # El propio worker recibe su NOTIFY por LISTEN: no se reparte aquí
+        payload = json.dumps(event, separators=(",", ":"))
+        async with self._publish_lock:
+            for attempt in (1, 2):
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = await self._connect()
+                    await self._publisher.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except Exception:
+                    if self._publisher is not None:
+                        await self._publisher.close()
+                    self._publisher = None
+                    if attempt == 2:
+                        raise
+
+
+def create_broker():
+    if REALTIME_BROKER == "postgres":
+        return PostgresBroker(DATABASE_URL, REALTIME_CHANNEL)
+    if REALTIME_BROKER != "memory":
+        raise RuntimeError(f"Unknown REALTIME_BROKER: {REALTIME_BROKER}")
+    return InProcessBroker()
+
+
+broker = create_broker()
+
+
+async def publish_board_event(
+    board_id: int,
+    revision: int,
+    entity: str,
+    action: str,
+    ids,
+    card_id: int | None = None,
+):
+    """
+    Publica una escritura ya confirmada. Un fallo del broker no debe romper
+    la petición (los datos ya están guardados): se registra y se sigue; los
+    clientes se recuperan con /changes.
+    """
+    event = {
+        "type": "change",
+        "board_id": board_id,
+        "revision": revision,
+        "entity": entity,
+        "action": action,
+        "ids": list(ids),
+    }
+    if card_id is not None:
+        event["card_id"] = card_id
+    try:
+        await broker.publish(board_id, event)
+    except Exception:
+        logger.exception("Could not publish board event %s", event)
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from backend.auth.utils import get_current_user, token_expires_at
+from backend.boards.access import BoardAccess
+from backend.config import REALTIME_AUTH_RECHECK
+from backend.database import get_db
+
+from .broker import broker
+
+router = APIRouter(tags=["realtime"])
+
+
+async def _board_revision_for(token: str | None, board_id: int) -> int | None:
+    """
+    Valida el token y el acceso al board con una sesión corta (no se
+    mantiene una conexión del pool durante toda la vida del WebSocket).
+    Devuelve la revisión actual del board, o None si no hay acceso.
+    """
+    if not token:
+        return None
+    sessions = get_db()
+    db = await anext(sessions)
+    try:
+        try:
+            user = await get_current_user(token=token, db=db)
+        except HTTPException:
+            return None
+        return await BoardAccess(db, user).board_revision(board_id)
+    finally:
+        await sessions.aclose()
+
+
+async def _send_events(websocket: WebSocket, subscription):
+    while True:
+        event = await subscription.queue.get()
+        await websocket.send_json(event)
+        # Cliente demasiado lento: tras avisar con "resync" se cierra
+        if subscription.overflowed and subscription.queue.empty():
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+
+async def _watch_access(websocket: WebSocket, token: str, board_id: int):
+    """
+    La conexión vive más que la comprobación inicial: se cierra cuando caduca
+    el token y, cada REALTIME_AUTH_RECHECK segundos, se vuelve a validar el
+    token y el acceso al board (usuario borrado, board eliminado o ajeno).
+    La comprobación va a la BD, así que ve los cambios hechos en otros workers.
+    """
+    expires_at = token_expires_at(token)
+    while True:
+        wait = REALTIME_AUTH_RECHECK
+        if expires_at is not None:
+            wait = min(wait, expires_at - time.time())
+        await asyncio.sleep(max(wait, 0))
+
+        if expires_at is not None and time.time() >= expires_at:
+            reason = "token expired"
+        elif await _board_revision_for(token, board_id) is None:
+            reason = "access revoked"
+        else:
+            continue
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
+        return
+
+
+async def _drain_client(websocket: WebSocket):
+    # Lo que mande el cliente (p. ej. keepalives) se ignora
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+# ---------------------------------------------------------
+# WS /ws/boards/{board_id}?token=<access token>
+# Eventos de tarjetas, etiquetas, subtareas y worklogs del board
+# ---------------------------------------------------------
+@router.websocket("/ws/boards/{board_id}")
+async def board_events(websocket: WebSocket, board_id: int, token: str | None = None):
+    """
+    El navegador no puede mandar Authorization en el handshake, así que el
+    token va en la query (también se acepta la cabecera Bearer).
+
+    Mensajes:
+    - {"type": "hello", "revision": R}: cursor inicial para /changes
+    - {"type": "change", "revision", "entity", "action", "ids", ...}
+    - {"type": "resync"}: se perdieron eventos; pedir /changes?since=<último>
+
+    Al caducar el token (o perderse el acceso) se cierra con 1008: el
+    cliente renueva el token (POST /auth/refresh) y vuelve a conectar.
+    """
+    if token is None:
+        authorization = websocket.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+
+    # Suscribirse antes de leer la revisión: ningún cambio cae en el hueco
+    async with broker.subscribe(board_id) as subscription:
+        revision = await _board_revision_for(token, board_id)
+        if revision is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        await websocket.accept()
+        await websocket.send_json({"type": "hello", "board_id": board_id, "revision": revision})
+
+        tasks = [
+            asyncio.create_task(_send_events(websocket, subscription)),
+            asyncio.create_task(_drain_client(websocket)),
+            asyncio.create_task(_watch_access(websocket, token, board_id)),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # Un envío fallido (cliente desaparecido) no es un error del servidor
+                if not task.cancelled() and isinstance(task.exception(), (WebSocketDisconnect, RuntimeError)):
+                    continue
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,94 @@
+from datetime import date
+
+from sqlalchemy import distinct, func, select
+
+from backend.cards.models import Card
+from backend.models import List
+from backend.worklogs.models import WorkLog
+
+
+# =========================================================
+# DIMENSIONES DE AGRUPACIÓN DE HORAS
+# =========================================================
+# Cada dimensión aporta una o varias columnas (nombre en la respuesta, expresión)
+HOURS_DIMENSIONS = {
+    "user": [("user_id", WorkLog.user_id)],
+    "card": [
+        ("card_id", Card.id),
+        ("title", Card.title),
+        ("responsible_id", Card.user_id),
+    ],
+    "list": [
+        ("list_id", List.id),
+        ("status", List.name),
+    ],
+    "day": [("date", WorkLog.date)],
+}
+
+# Métricas calculadas en la BD para cada grupo
+HOURS_METRICS = {
+    "total_hours": func.sum(WorkLog.hours),
+    "tasks_count": func.count(distinct(WorkLog.card_id)),
+}
+
+
+def parse_dimensions(group_by: str) -> list[str]:
+    """
+    "user,day" → ["user", "day"]. Lanza ValueError si alguna no existe.
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in HOURS_DIMENSIONS]
+    if not dimensions or unknown:
+        raise ValueError(
+            f"group_by must be a comma-separated list of: {', '.join(HOURS_DIMENSIONS)}"
+        )
+    # Sin duplicados, respetando el orden pedido
+    return list(dict.fromkeys(dimensions))
+
+
+def build_hours_query(
+    board_id: int,
+    start_date: date,
+    end_date: date,
+    dimensions: list[str],
+    metrics: list[str] = ("total_hours", "tasks_count"),
+    order_by_hours: bool = False,
+):
+    """
+    Construye un único SELECT ... GROUP BY sobre los worklogs del board en
+    [start_date, end_date), agrupado por las dimensiones indicadas.
+    La agregación (SUM / COUNT DISTINCT) se hace entera en la base de datos.
+    """
+    group_cols = [
+        (name, expr)
+        for dimension in dimensions
+        for name, expr in HOURS_DIMENSIONS[dimension]
+    ]
+
+    stmt = (
+        select(
+            *(expr.label(name) for name, expr in group_cols),
+            *(HOURS_METRICS[name].label(name) for name in metrics),
+        )
+        .select_from(WorkLog)
+        .join(Card, WorkLog.card_id == Card.id)
+        .where(
+            Card.board_id == board_id,
+            WorkLog.date >= start_date,
+            WorkLog.date < end_date,
+        )
+        .group_by(*(expr for _name, expr in group_cols))
+    )
+
+    if "list" in dimensions:
+        stmt = stmt.join(List, Card.list_id == List.id)
+
+    if order_by_hours:
+        stmt = stmt.order_by(
+            HOURS_METRICS["total_hours"].desc(),
+            *(expr for _name, expr in group_cols),
+        )
+    else:
+        stmt = stmt.order_by(*(expr for _name, expr in group_cols))
+
+    return stmt
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+
+from backend.config import REPORT_CACHE_CURRENT_TTL, REPORT_CACHE_SIZE
+
+
+# =========================================================
+# CACHÉ DE INFORMES SEMANALES
+# =========================================================
+# Clave: (board_id, week, report_type). Valor: el cuerpo JSON ya serializado
+# y la huella del rango de fechas con la que se calculó (ver
+# reportsweek/routes.py: report_stamp).
+#
+# - La huella sale de la BD (número de filas del rango y su revisión
+#   máxima), así que solo cambia cuando una escritura toca las filas de esa
+#   semana, hecha en este worker o en otro. Una escritura en otra semana del
+#   mismo board no invalida nada.
+# - Una entrada solo se sirve si la huella actual del rango es la misma.
+# - Semanas cerradas (terminaron antes de ayer): sin caducidad por tiempo.
+#   El día de margen cubre la diferencia entre la fecha local y la UTC de
+#   created_at / updated_at.
+# - Semana en curso: caducan a los REPORT_CACHE_CURRENT_TTL segundos como red
+#   de seguridad (el resumen depende también de la fecha de hoy).
+# - Además, una escritura de tarjeta o worklog en el board borra de este
+#   worker las entradas cuyo rango de fechas contiene las fechas afectadas,
+#   para no ocupar memoria con entradas que ya no se servirán.
+
+SUMMARY = "summary"
+
+
+def _is_hours(report_type: str) -> bool:
+    return report_type != SUMMARY
+
+
+def _as_date(value) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+class ReportCache:
+    def __init__(self, maxsize: int, current_ttl: float):
+        self.maxsize = maxsize
+        self.current_ttl = current_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key → (start_date, end_date, expires | None, stamp, body)
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+
+    # -----------------------------
+    # Lectura / escritura
+    # -----------------------------
+    def get(self, key: tuple, stamp: tuple) -> bytes | None:
+        """
+        Cuerpo guardado para `key` si se calculó con la huella `stamp` del
+        rango y no ha caducado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[3] != stamp
+                or (entry[2] is not None and entry[2] < time.monotonic())
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[4]
+
+    def put(self, key: tuple, start_date: date, end_date: date, body: bytes, stamp: tuple):
+        """
+        Guarda un cuerpo calculado después de leer la huella `stamp` del rango.
+        """
+        if self.maxsize <= 0:
+            return
+        # end_date es exclusivo: la semana terminó ayer como pronto
+        closed = end_date < date.today()
+        expires = None if closed else time.monotonic() + self.current_ttl
+        with self._lock:
+            self._entries[key] = (start_date, end_date, expires, stamp, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def tee(self, key: tuple, start_date: date, end_date: date, stamp: tuple, chunks):
+        """
+        Reenvía un cuerpo en streaming y, al terminar, lo guarda en la caché.
+        """
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.put(key, start_date, end_date, b"".join(parts), stamp)
+
+    # -----------------------------
+    # Invalidación
+    # -----------------------------
+    def touch(self, board_id: int, dates, hours: bool = True, summary: bool = True):
+        """
+        Invalida las entradas del board cuyo rango contiene alguna de las
+        fechas (date o datetime). `hours` / `summary` eligen qué informes.
+        """
+        touched = {d for d in map(_as_date, dates) if d is not None}
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == board_id]:
+                start_date, end_date = self._entries[key][:2]
+                wanted = hours if _is_hours(key[2]) else summary
+                if wanted and any(start_date <= d < end_date for d in touched):
+                    del self._entries[key]
+
+    def invalidate_board(self, board_id: int, hours: bool = True, summary: bool = True):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == board_id]:
+                if hours if _is_hours(key[2]) else summary:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+report_cache = ReportCache(REPORT_CACHE_SIZE, REPORT_CACHE_CURRENT_TTL)
@@ -1,18 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-import pandas as pd
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Dependencias comunes del backend
 from backend.database import get_db
-from backend.auth.utils import get_current_user
+from backend.boards.access import BoardAccess, get_access
 
 # Modelos principales
-from backend.models import Board, User, List
+from backend.models import List
 from backend.cards.models import Card
 from backend.worklogs.models import WorkLog
+from backend.serialization import dumps
+from backend.querystats import query_budget
 
 # Utilidades del módulo de reportes
-from .utils import get_week_date_range, serialize_card
+from .aggregations import build_hours_query, parse_dimensions
+from .cache import SUMMARY, report_cache
+from .utils import get_week_date_range, serialize_card, stream_json_rows
 
 
 # =========================
@@ -28,40 +33,107 @@ router = APIRouter(
 # =========================
 # FUNCIÓN DE SEGURIDAD
 # =========================
-def get_board_or_403(
+async def get_board_or_403(
     board_id: int,
-    db: Session,
-    current_user: User
-) -> Board:
+    access: BoardAccess,
+):
     """
     Comprueba que el board existe y pertenece al usuario autenticado.
     Si no es así, devuelve error 403.
     """
 
-    board = (
-        db.query(Board)
-        .filter(Board.id == board_id)
-        .first()
-    )
+    await access.require_board(board_id, detail="You do not have access to this board")
 
-    if not board or board.user_id != current_user.id:
-        raise HTTPException(
-            status_code=403,
-            detail="You do not have access to this board"
+
+async def report_stamp(
+    db, board_id: int, start_date, end_date, report_type: str, card_columns: bool = False
+) -> tuple:
+    """
+    Huella de las filas de las que depende un informe en [start_date, end_date):
+    (número de filas, revisión máxima). Una sola consulta.
+
+    Las revisiones del board solo crecen: una fila que entra en el rango o
+    cambia sube la revisión máxima, y una que sale (o se borra) baja la
+    cuenta. Así la huella cambia con cualquier escritura en el rango y con
+    ninguna fuera de él.
+    - Horas: worklogs del rango. Con `card_columns` (el informe muestra
+      título o lista) también la revisión de sus tarjetas.
+    - Resumen: tarjetas creadas, actualizadas o que vencen en el rango.
+    """
+    if report_type == SUMMARY:
+        stmt = select(func.count(Card.id), func.max(Card.revision)).where(
+            Card.board_id == board_id,
+            or_(
+                and_(Card.created_at >= start_date, Card.created_at < end_date),
+                and_(Card.updated_at >= start_date, Card.updated_at < end_date),
+                and_(Card.due_date >= start_date, Card.due_date < end_date),
+            ),
+        )
+    else:
+        columns = [func.count(WorkLog.id), func.max(WorkLog.revision)]
+        if card_columns:
+            columns.append(func.max(Card.revision))
+        stmt = (
+            select(*columns)
+            .select_from(WorkLog)
+            .join(Card, WorkLog.card_id == Card.id)
+            .where(
+                Card.board_id == board_id,
+                WorkLog.date >= start_date,
+                WorkLog.date < end_date,
+            )
         )
+    return tuple((await db.execute(stmt)).one())
+
+
+def cached_response(key: tuple, stamp: tuple) -> Response | None:
+    """
+    Respuesta directa desde la caché de informes, o None si no está
+    (o se calculó con otra huella del rango).
+    """
+    body = report_cache.get(key, stamp)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
 
-    return board
+
+async def stream_and_cache(db, key: tuple, stamp: tuple, start_date, end_date, query):
+    """
+    Ejecuta la consulta en streaming y guarda el cuerpo al terminar,
+    asociado a la huella leída antes de consultar.
+    """
+    rows = await db.stream(query)
+    return StreamingResponse(
+        report_cache.tee(key, start_date, end_date, stamp, stream_json_rows(rows)),
+        media_type="application/json",
+    )
+
+
+# =========================================================
+#  ESTADÍSTICAS DE LA CACHÉ
+# =========================================================
+@router.get("/cache/stats")
+async def cache_stats(
+    access: BoardAccess = Depends(get_access),
+):
+    """
+    Aciertos / fallos de la caché de informes (local a este worker).
+    """
+    return report_cache.stats()
 
 
 # =========================================================
 #  RESUMEN SEMANAL
 # =========================================================
+# Presupuesto de los informes (caso frío): principal, dueño del board, huella
+# del rango y la consulta del informe. Con caché: solo la huella.
 @router.get("/{board_id}/summary")
-def weekly_summary(
+@query_budget(4)
+async def weekly_summary(
     board_id: int,
     week: str = Query(..., description="Week in format YYYY-WW"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
     """
     Devuelve un resumen semanal del board:
@@ -71,7 +143,7 @@ def weekly_summary(
     """
 
     # --- Seguridad: comprobar que el board es del usuario ---
-    board = get_board_or_403(board_id, db, current_user)
+    await get_board_or_403(board_id, access)
 
     # --- Calcular rango de fechas de la semana ---
     # (lunes -> lunes siguiente)
@@ -80,63 +152,56 @@ def weekly_summary(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-
-    # -------------------------------------------------
-    # TARJETAS NUEVAS
-    # -------------------------------------------------
-    # Tarjetas creadas durante la semana
-    new_cards = (
-        db.query(Card)
-        .filter(
-            Card.board_id == board.id,
-            Card.created_at >= start_date,
-            Card.created_at < end_date,
-        )
-        .all()
-    )
+    # --- Caché: válida mientras no cambien las tarjetas de la semana ---
+    key = (board_id, week, SUMMARY)
+    stamp = await report_stamp(db, board_id, start_date, end_date, SUMMARY)
+    cached = cached_response(key, stamp)
+    if cached is not None:
+        return cached
 
 
     # -------------------------------------------------
-    # TARJETAS COMPLETADAS
+    # CLASIFICACIÓN EN UNA SOLA PASADA
     # -------------------------------------------------
-    # Tarjetas que:
-    # - están en la lista "Hecho"
-    # - se actualizaron durante la semana
-    completed_cards = (
-        db.query(Card)
-        .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            List.name == "Hecho",
-            Card.updated_at >= start_date,
-            Card.updated_at < end_date,
+    # - nueva: creada durante la semana
+    # - completada: está en la lista "Hecho" y se actualizó durante la semana
+    # - vencida: vence durante la semana y NO está en "Hecho"
+    # Cada condición se evalúa en SQL como columna booleana; una misma
+    # tarjeta puede caer en varias categorías.
+    is_done = List.name == "Hecho"
+    is_new = and_(Card.created_at >= start_date, Card.created_at < end_date)
+    is_completed = and_(is_done, Card.updated_at >= start_date, Card.updated_at < end_date)
+    is_overdue = and_(~is_done, Card.due_date >= start_date, Card.due_date < end_date)
+
+    rows = (
+        await db.execute(
+            select(
+                Card.id,
+                Card.title,
+                Card.list_id,
+                Card.user_id,
+                Card.due_date,
+                is_new.label("is_new"),
+                is_completed.label("is_completed"),
+                is_overdue.label("is_overdue"),
+            )
+            .join(List, Card.list_id == List.id)
+            .where(
+                Card.board_id == board_id,
+                or_(is_new, is_completed, is_overdue),
+            )
+            .order_by(Card.id)
         )
-        .all()
-    )
-
+    ).all()
 
-    # -------------------------------------------------
-    # TARJETAS VENCIDAS
-    # -------------------------------------------------
-    # Tarjetas que:
-    # - tienen fecha de vencimiento en la semana
-    # - NO están en "Hecho"
-    overdue_cards = (
-        db.query(Card)
-        .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            Card.due_date >= start_date,
-            Card.due_date < end_date,
-            List.name != "Hecho",
-        )
-        .all()
-    )
+    new_cards = [row for row in rows if row.is_new]
+    completed_cards = [row for row in rows if row.is_completed]
+    overdue_cards = [row for row in rows if row.is_overdue]
 
 
     # --- Respuesta final para frontend ---
-    return {
-        "board_id": board.id,
+    result = {
+        "board_id": board_id,
         "week": week,
         "range": {
             "start": start_date.isoformat(),
@@ -150,16 +215,21 @@ def weekly_summary(
         "overdue_count": len(overdue_cards),
     }
 
+    body = dumps(result)
+    report_cache.put(key, start_date, end_date, body, stamp)
+    return Response(content=body, media_type="application/json")
+
 
 # =========================================================
 #  HORAS TRABAJADAS POR USUARIO
 # =========================================================
 @router.get("/{board_id}/hours-by-user")
-def hours_by_user(
+@query_budget(4)
+async def hours_by_user(
     board_id: int,
     week: str = Query(..., description="Week in format YYYY-WW"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
     """
     Devuelve:
@@ -168,7 +238,7 @@ def hours_by_user(
     """
 
     # Seguridad
-    board = get_board_or_403(board_id, db, current_user)
+    await get_board_or_403(board_id, access)
 
     # Rango semanal
     try:
@@ -178,58 +248,31 @@ def hours_by_user(
 
 
     # -------------------------------------------------
-    # CONSULTA BASE
+    # AGREGACIÓN EN SQL
     # -------------------------------------------------
-    # Se obtienen todos los worklogs de la semana
-    # relacionados con tarjetas del board
-    worklogs_query = (
-        db.query(
-            WorkLog.user_id,
-            WorkLog.card_id,
-            WorkLog.hours
-        )
-        .join(Card, WorkLog.card_id == Card.id)
-        .filter(
-            Card.board_id == board.id,
-            WorkLog.date >= start_date,
-            WorkLog.date < end_date,
-        )
-    )
-
-    rows = worklogs_query.all()
-
-    if not rows:
-        return []
-
+    # - Suma de horas por usuario (SUM)
+    # - Número de tarjetas distintas por usuario (COUNT DISTINCT)
+    key = (board_id, week, "hours-by-user")
+    stamp = await report_stamp(db, board_id, start_date, end_date, key[2])
+    cached = cached_response(key, stamp)
+    if cached is not None:
+        return cached
 
-    # -------------------------------------------------
-    # AGREGACIÓN CON PANDAS
-    # -------------------------------------------------
-    # - Suma de horas por usuario
-    # - Número de tarjetas distintas por usuario
-    df = pd.DataFrame(rows, columns=["user_id", "card_id", "hours"])
-
-    result_df = (
-        df.groupby("user_id")
-        .agg(
-            total_hours=("hours", "sum"),
-            tasks_count=("card_id", "nunique")
-        )
-        .reset_index()
-    )
+    query = build_hours_query(board_id, start_date, end_date, ["user"])
 
-    return result_df.to_dict(orient="records")
+    return await stream_and_cache(db, key, stamp, start_date, end_date, query)
 
 
 # =========================================================
 #  HORAS TRABAJADAS POR TARJETA
 # =========================================================
 @router.get("/{board_id}/hours-by-card")
-def hours_by_card(
+@query_budget(4)
+async def hours_by_card(
     board_id: int,
     week: str = Query(..., description="Week in format YYYY-WW"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
 ):
     """
     Devuelve:
@@ -239,7 +282,7 @@ def hours_by_card(
     """
 
     # Seguridad
-    board = get_board_or_403(board_id, db, current_user)
+    await get_board_or_403(board_id, access)
 
     # Rango semanal
     try:
@@ -249,53 +292,61 @@ def hours_by_card(
 
 
     # -------------------------------------------------
-    # CONSULTA BASE
+    # AGREGACIÓN EN SQL
     # -------------------------------------------------
-    # Se obtienen las horas de cada tarjeta de la semana
-    worklogs_query = (
-        db.query(
-            Card.id.label("card_id"),
-            Card.title,
-            Card.user_id.label("responsible_id"),
-            List.name.label("status"),
-            WorkLog.hours
-        )
-        .join(WorkLog, WorkLog.card_id == Card.id)
-        .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            WorkLog.date >= start_date,
-            WorkLog.date < end_date,
-        )
+    # Suma de horas por tarjeta, de más a menos horas
+    key = (board_id, week, "hours-by-card")
+    stamp = await report_stamp(db, board_id, start_date, end_date, key[2], card_columns=True)
+    cached = cached_response(key, stamp)
+    if cached is not None:
+        return cached
+
+    query = build_hours_query(
+        board_id,
+        start_date,
+        end_date,
+        ["card", "list"],
+        metrics=["total_hours"],
+        order_by_hours=True,
     )
 
-    rows = worklogs_query.all()
+    return await stream_and_cache(db, key, stamp, start_date, end_date, query)
 
-    if not rows:
-        return []
 
+# =========================================================
+#  HORAS AGRUPADAS POR VARIAS DIMENSIONES
+# =========================================================
+@router.get("/{board_id}/hours")
+@query_budget(4)
+async def hours_grouped(
+    board_id: int,
+    week: str = Query(..., description="Week in format YYYY-WW"),
+    group_by: str = Query("user", description="Comma-separated: user, card, list, day"),
+    db: AsyncSession = Depends(get_db),
+    access: BoardAccess = Depends(get_access),
+):
+    """
+    Horas de la semana agrupadas por cualquier combinación de dimensiones
+    (por ejemplo group_by=user,day). Cada fila trae las columnas de las
+    dimensiones + total_hours + tasks_count.
+    """
 
-    # -------------------------------------------------
-    # AGREGACIÓN CON PANDAS
-    # -------------------------------------------------
-    # Suma de horas por tarjeta
-    df = pd.DataFrame(
-        rows,
-        columns=[
-            "card_id",
-            "title",
-            "responsible_id",
-            "status",
-            "hours",
-        ],
-    )
+    # Seguridad
+    await get_board_or_403(board_id, access)
 
-    result_df = (
-        df.groupby(["card_id", "title", "responsible_id", "status"])
-        .agg(total_hours=("hours", "sum"))
-        .reset_index()
-        .sort_values("total_hours", ascending=False)
-    )
+    try:
+        start_date, end_date = get_week_date_range(week)
+        dimensions = parse_dimensions(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = (board_id, week, "hours:" + ",".join(dimensions))
+    card_columns = bool({"card", "list"} & set(dimensions))
+    stamp = await report_stamp(db, board_id, start_date, end_date, key[2], card_columns)
+    cached = cached_response(key, stamp)
+    if cached is not None:
+        return cached
 
-    return result_df.to_dict(orient="records")
+    query = build_hours_query(board_id, start_date, end_date, dimensions)
 
+    return await stream_and_cache(db, key, stamp, start_date, end_date, query)
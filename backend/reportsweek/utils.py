@@ -2,6 +2,7 @@ from datetime import date
 import re
 
 from backend.cards.models import Card
+from backend.serialization import dumps
 
 
 # =========================================================
@@ -9,7 +10,7 @@ from backend.cards.models import Card
 # =========================================================
 def serialize_card(card: Card) -> dict:
     """
-    Convierte una tarjeta (objeto Card de la base de datos)
+    Convierte una tarjeta (objeto Card o fila con sus columnas)
     en un diccionario JSON simple que el frontend puede usar.
 
     Esta función evita devolver el objeto SQLAlchemy completo,
@@ -89,3 +90,20 @@ def get_week_date_range(week: str) -> tuple[date, date]:
         raise ValueError("Invalid ISO week")
 
     return start_date, end_date
+
+
+# =========================================================
+# FUNCIÓN: stream_json_rows
+# =========================================================
+async def stream_json_rows(rows):
+    """
+    Recibe las filas de un resultado en streaming (db.stream) y las emite
+    como un array JSON, fila a fila, sin montar la lista completa en memoria.
+    """
+    yield b"["
+    first = True
+    async for row in rows:
+        chunk = dumps(dict(row._mapping))
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
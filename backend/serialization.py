@@ -0,0 +1,45 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+# =========================================================
+# SERIALIZACIÓN JSON RÁPIDA
+# =========================================================
+# Para los listados grandes (tarjetas, snapshot, cambios, informes): los
+# datos ya son dicts / filas de tipos simples, así que se codifican
+# directamente, sin el recorrido genérico de jsonable_encoder.
+# El resultado es el mismo JSON que antes (fechas en ISO 8601).
+
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+def dumps_items(items) -> bytes:
+    """
+    Elementos de un array JSON sin los corchetes, separados por comas:
+    para emitir un array por lotes en streaming.
+    """
+    return dumps(items)[1:-1]
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse que codifica con dumps(). Devolverla directamente desde una
+    ruta evita la validación del response_model y jsonable_encoder; el
+    response_model sigue documentando el esquema en OpenAPI.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
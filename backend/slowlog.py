@@ -0,0 +1,231 @@
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from backend.config import (
+    SLOW_QUERY_EXPLAIN_ANALYZE,
+    SLOW_QUERY_EXPLAIN_SAMPLE,
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+    SLOW_QUERY_LOG_PARAMS,
+    SLOW_QUERY_LOG_SIZE,
+    SLOW_QUERY_MS,
+)
+from backend.querystats import current_stats
+
+logger = logging.getLogger("backend.slowlog")
+
+# Límites de lo que se guarda por entrada
+_MAX_STATEMENT = 5000
+_MAX_PARAM = 200
+
+
+def _redacted_value(value):
+    # Solo tipo y, en textos y binarios, longitud: sin el valor
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _raw_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = repr(value) if isinstance(value, (bytes, bytearray)) else str(value)
+    return text if len(text) <= _MAX_PARAM else text[:_MAX_PARAM] + "…"
+
+
+def _safe_params(parameters, executemany: bool, raw: bool = False):
+    """
+    Parámetros en forma serializable a JSON y acotada. Salvo con `raw`
+    (SLOW_QUERY_LOG_PARAMS), cada valor se sustituye por su tipo y longitud:
+    las consultas de login o refresh llevan emails y hashes.
+    En executemany solo se guardan el número de filas y la primera.
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "first": _safe_params(first, False, raw)}
+    safe_value = _raw_value if raw else _redacted_value
+    if isinstance(parameters, dict):
+        return {key: safe_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [safe_value(value) for value in parameters]
+    return safe_value(parameters)
+
+
+def _explain_sql(dialect: str, statement: str) -> str:
+    if dialect == "postgresql":
+        options = "ANALYZE, BUFFERS" if SLOW_QUERY_EXPLAIN_ANALYZE else "COSTS"
+        return f"EXPLAIN ({options}) {statement}"
+    if dialect == "sqlite":
+        return f"EXPLAIN QUERY PLAN {statement}"
+    return f"EXPLAIN {statement}"
+
+
+# =============================
+# Registro de consultas lentas
+# =============================
+
+class SlowQueryLog:
+    """
+    Guarda en un buffer circular (las últimas `size`) las sentencias que
+    tardan más de `threshold_ms`, con sus parámetros (redactados salvo con
+    `raw_params`) y la ruta de la petición que las lanzó.
+
+    A una fracción `explain_sample` de las lentas (solo SELECT) se les
+    captura el plan en segundo plano: un hilo aparte repite la sentencia con
+    EXPLAIN en otra conexión del motor síncrono, dentro de una transacción
+    que se deshace. Así la petición original no espera al EXPLAIN.
+    En PostgreSQL se usa EXPLAIN (ANALYZE, BUFFERS), que vuelve a ejecutar
+    la consulta: por eso el muestreo y el statement_timeout.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain_sample: float, raw_params: bool = False):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample = explain_sample
+        self.raw_params = raw_params
+        self._entries: deque[dict] = deque(maxlen=max(size, 1))
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._explain_engine = None
+        self._explain_queue: queue.Queue = queue.Queue(maxsize=32)
+        self._explain_thread: threading.Thread | None = None
+        # Marca el hilo del EXPLAIN para no registrarse a sí mismo
+        self._local = threading.local()
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def attach(self, engine, explain_engine=None):
+        """
+        Engancha el registro a un motor (el síncrono; para uno async, su
+        .sync_engine). `explain_engine` es el motor síncrono con el que se
+        capturan los planes.
+        """
+        if not self.enabled:
+            return
+        if explain_engine is not None:
+            self._explain_engine = explain_engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._slowlog_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            if context is None or getattr(self._local, "explaining", False):
+                return
+            elapsed = time.perf_counter() - context._slowlog_started
+            if elapsed >= self.threshold:
+                self.record(conn.dialect.name, statement, parameters, executemany, elapsed)
+
+    def record(self, dialect: str, statement: str, parameters, executemany: bool, elapsed: float):
+        stats = current_stats()
+        entry = {
+            "id": next(self._ids),
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed * 1000, 2),
+            "route": stats.route() if stats is not None else None,
+            "statement": statement[:_MAX_STATEMENT],
+            "parameters": _safe_params(parameters, executemany, self.raw_params),
+            "executemany": executemany,
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+        logger.warning(
+            "%.1f ms %s: %s", entry["duration_ms"], entry["route"] or "-",
+            " ".join(statement.split())[:200],
+        )
+
+        if (
+            self._explain_engine is not None
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample
+        ):
+            self._schedule_explain(entry, dialect, statement, parameters)
+
+    # ----------------------------------------
+    # EXPLAIN en segundo plano
+    # ----------------------------------------
+    def _schedule_explain(self, entry: dict, dialect: str, statement: str, parameters):
+        try:
+            self._explain_queue.put_nowait((entry, dialect, statement, parameters))
+        except queue.Full:
+            entry["plan"] = "(omitido: cola de EXPLAIN llena)"
+            return
+        entry["plan"] = "(pendiente)"
+        if self._explain_thread is None or not self._explain_thread.is_alive():
+            self._explain_thread = threading.Thread(
+                target=self._explain_worker, name="slowlog-explain", daemon=True
+            )
+            self._explain_thread.start()
+
+    def _explain_worker(self):
+        self._local.explaining = True
+        while True:
+            entry, dialect, statement, parameters = self._explain_queue.get()
+            try:
+                entry["plan"] = self._explain(dialect, statement, parameters)
+            except Exception as exc:
+                # El texto de los errores de SQLAlchemy incluye los parámetros:
+                # salvo con raw_params, solo el error del driver
+                detail = exc if self.raw_params else getattr(exc, "orig", None) or ""
+                entry["plan"] = f"(error en EXPLAIN: {exc.__class__.__name__}: {detail})"[:1000]
+
+    def _explain(self, dialect: str, statement: str, parameters) -> str:
+        with self._explain_engine.connect() as conn:
+            try:
+                if dialect == "postgresql":
+                    conn.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = {int(SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}"
+                    )
+                rows = conn.exec_driver_sql(_explain_sql(dialect, statement), parameters).all()
+            finally:
+                conn.rollback()
+        # PostgreSQL: una columna de texto por línea; SQLite: el detalle va al final
+        return "\n".join(str(row[-1]) for row in rows)
+
+    # ----------------------------------------
+    # Consulta del buffer
+    # ----------------------------------------
+    def entries(self, limit: int | None = None) -> list[dict]:
+        """
+        Las más recientes primero.
+        """
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit is not None else items
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def settings(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "size": self._entries.maxlen,
+            "explain_sample": self.explain_sample,
+            "explain_analyze": SLOW_QUERY_EXPLAIN_ANALYZE,
+            "raw_params": self.raw_params,
+            "recorded": self.recorded,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN_SAMPLE, SLOW_QUERY_LOG_PARAMS
+)
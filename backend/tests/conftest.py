@@ -0,0 +1,60 @@
+"""
+Pruebas de comportamiento contra la app completa (TestClient).
+
+La configuración se lee al importar backend, así que el entorno se fija
+aquí, antes de cualquier import. Sin DATABASE_URL se usa una base SQLite
+temporal; con DATABASE_URL se aplican las migraciones sobre esa base y cada
+prueba crea su propio usuario (no se borra nada).
+
+    python -m pytest backend/tests
+"""
+import os
+import tempfile
+import uuid
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tests.db")
+# bcrypt barato y en el threadpool: las pruebas no miden el hashing
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def ok(response, code: int = 200):
+    assert response.status_code == code, (response.request.method, response.request.url, response.text)
+    return response.json() if response.content else None
+
+
+@pytest.fixture
+def user(client) -> dict:
+    """
+    Usuario nuevo con su board por defecto: tokens, cabeceras y los ids del
+    board y de su lista "Por hacer".
+    """
+    email = f"test-{uuid.uuid4().hex[:12]}@example.com"
+    password = "test-password"
+    ok(client.post("/auth/register", json={"email": email, "password": password}), 201)
+    tokens = ok(client.post("/auth/login", data={"username": email, "password": password}))
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    board_id = ok(client.get("/boards/", headers=headers))[0]["id"]
+    lists = ok(client.get(f"/boards/{board_id}/lists", headers=headers))
+    list_id = next(lst["id"] for lst in lists if lst["name"].lower() == "por hacer")
+    return {
+        "email": email,
+        "tokens": tokens,
+        "headers": headers,
+        "board_id": board_id,
+        "list_id": list_id,
+    }
@@ -0,0 +1,99 @@
+"""
+PostgresBroker contra un PostgreSQL real: dos brokers (dos "workers") en el
+mismo canal, publicación → suscripción y reconexión de la escucha.
+
+Solo se ejecuta si DATABASE_URL apunta a PostgreSQL:
+
+    DATABASE_URL=postgresql+psycopg://... python -m pytest backend/tests/test_realtime_broker.py
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith("postgresql"),
+    reason="DATABASE_URL no apunta a PostgreSQL",
+)
+
+BOARD_ID = 1
+TIMEOUT = 10
+
+
+def is_change(event: dict) -> bool:
+    return event.get("type") == "change"
+
+
+async def _next_event(subscription, wanted=lambda event: True):
+    """
+    Siguiente evento de la suscripción que cumple `wanted` (descarta el resto).
+    """
+    async def wait():
+        while True:
+            event = await subscription.queue.get()
+            if wanted(event):
+                return event
+
+    return await asyncio.wait_for(wait(), TIMEOUT)
+
+
+async def _wait_listening(publisher, subscription):
+    """
+    La escucha arranca en segundo plano: se publican sondas hasta que llega una.
+    """
+    probe = {"type": "probe", "board_id": BOARD_ID, "id": uuid.uuid4().hex}
+    deadline = asyncio.get_running_loop().time() + TIMEOUT
+    while True:
+        await publisher.publish(BOARD_ID, probe)
+        try:
+            await asyncio.wait_for(_next_event(subscription, lambda e: e == probe), 0.5)
+            return
+        except asyncio.TimeoutError:
+            if asyncio.get_running_loop().time() > deadline:
+                raise
+
+
+async def _scenario():
+    from backend.realtime.broker import PostgresBroker
+
+    channel = f"test_board_events_{uuid.uuid4().hex[:8]}"
+    first = PostgresBroker(DATABASE_URL, channel)
+    second = PostgresBroker(DATABASE_URL, channel)
+    second.RECONNECT_DELAY = 0.1
+    await first.start()
+    await second.start()
+    try:
+        async with first.subscribe(BOARD_ID) as own, second.subscribe(BOARD_ID) as other:
+            await _wait_listening(first, other)
+            await _wait_listening(first, own)
+
+            # Publicación → ambos workers (también el que publica, vía LISTEN)
+            event = {"type": "change", "board_id": BOARD_ID, "revision": 7, "ids": [1]}
+            await first.publish(BOARD_ID, event)
+            assert await _next_event(other, is_change) == event
+            assert await _next_event(own, is_change) == event
+
+            # Se corta la escucha del segundo desde el servidor: reconecta y
+            # pide resync a sus conexiones (se han podido perder eventos)
+            import psycopg
+
+            pid = second._listener.info.backend_pid
+            async with await psycopg.AsyncConnection.connect(second.conninfo, autocommit=True) as admin:
+                await admin.execute("SELECT pg_terminate_backend(%s)", (pid,))
+            assert await _next_event(other, lambda e: e.get("type") == "resync") == {"type": "resync"}
+
+            # Y vuelve a recibir lo que se publica después
+            await _wait_listening(first, other)
+            event = {"type": "change", "board_id": BOARD_ID, "revision": 8, "ids": [2]}
+            await first.publish(BOARD_ID, event)
+            assert await _next_event(other, is_change) == event
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+def test_postgres_broker_fan_out_and_reconnect():
+    asyncio.run(_scenario())
@@ -0,0 +1,41 @@
+"""
+Rotación de refresh tokens (POST /auth/refresh).
+"""
+from backend.tests.conftest import ok
+
+
+def _refresh(client, token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_the_token(client, user):
+    first = user["tokens"]["refresh_token"]
+    rotated = ok(_refresh(client, first))
+    assert rotated["refresh_token"] != first
+
+    me = ok(client.get("/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}))
+    assert me["email"] == user["email"]
+
+
+def test_reusing_a_rotated_token_revokes_the_family(client, user):
+    first = user["tokens"]["refresh_token"]
+    second = ok(_refresh(client, first))["refresh_token"]
+    third = ok(_refresh(client, second))["refresh_token"]
+
+    # Reutilizar un token ya rotado (posible robo) → 401...
+    assert _refresh(client, first).status_code == 401
+    # ...y el último de la familia deja de servir también
+    assert _refresh(client, third).status_code == 401
+
+
+def test_other_sessions_survive_a_revoked_family(client, user):
+    other = ok(client.post(
+        "/auth/login", data={"username": user["email"], "password": "test-password"},
+    ))["refresh_token"]
+
+    first = user["tokens"]["refresh_token"]
+    ok(_refresh(client, first))
+    assert _refresh(client, first).status_code == 401
+
+    # Otro login es otra familia: no se ve afectada
+    assert _refresh(client, other).status_code == 200
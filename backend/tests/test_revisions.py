@@ -0,0 +1,76 @@
+"""
+Revisión del board: ETag / 304 en los listados y feed de cambios
+(GET /boards/{id}/changes?since=<revisión>).
+"""
+from backend.tests.conftest import ok
+
+
+def _list_cards(client, user, etag: str | None = None):
+    headers = dict(user["headers"])
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    return client.get("/cards/", params={"board_id": user["board_id"]}, headers=headers)
+
+
+def _changes(client, user, since: int) -> dict:
+    return ok(client.get(
+        f"/boards/{user['board_id']}/changes", params={"since": since}, headers=user["headers"],
+    ))
+
+
+def test_etag_not_modified_until_a_write(client, user):
+    ok(client.post("/cards/", json={
+        "title": "ETag", "board_id": user["board_id"], "list_id": user["list_id"],
+    }, headers=user["headers"]))
+
+    first = _list_cards(client, user)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    cached = _list_cards(client, user, etag)
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    card_id = first.json()[0]["id"]
+    ok(client.patch(f"/cards/{card_id}", json={"title": "ETag 2"}, headers=user["headers"]))
+
+    after = _list_cards(client, user, etag)
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert after.json()[0]["title"] == "ETag 2"
+
+
+def test_changes_since_revision(client, user):
+    headers = user["headers"]
+    card = ok(client.post("/cards/", json={
+        "title": "Cambios", "board_id": user["board_id"], "list_id": user["list_id"],
+    }, headers=headers))
+    label = ok(client.post(f"/cards/{card['id']}/labels", json={"name": "a", "color": "red"}, headers=headers))
+    other = ok(client.post("/cards/", json={
+        "title": "Quieta", "board_id": user["board_id"], "list_id": user["list_id"],
+    }, headers=headers))
+
+    cursor = _changes(client, user, 0)["cursor"]
+
+    # Sin escrituras: mismo cursor y nada que devolver
+    empty = _changes(client, user, cursor)
+    assert empty["cursor"] == cursor
+    assert empty["cards"] == [] and all(ids == [] for ids in empty["deleted"].values())
+
+    ok(client.patch(f"/cards/{card['id']}", json={"title": "Cambiada"}, headers=headers))
+    ok(client.delete(f"/labels/{label['id']}", headers=headers))
+    ok(client.delete(f"/cards/{other['id']}", headers=headers))
+
+    changes = _changes(client, user, cursor)
+    assert changes["cursor"] == cursor + 3
+    assert [c["id"] for c in changes["cards"]] == [card["id"]]
+    assert changes["cards"][0]["title"] == "Cambiada"
+    assert changes["deleted"]["labels"] == [label["id"]]
+    assert changes["deleted"]["cards"] == [other["id"]]
+
+    # Un cursor por delante del board no es válido
+    ahead = client.get(
+        f"/boards/{user['board_id']}/changes", params={"since": changes["cursor"] + 1}, headers=headers,
+    )
+    assert ahead.status_code == 409
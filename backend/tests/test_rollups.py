@@ -0,0 +1,81 @@
+"""
+Totales desnormalizados de las tarjetas (cards/rollups.py): los incrementos
+de las rutas deben coincidir con lo que recalcula la reconciliación.
+"""
+from sqlalchemy import text
+
+from backend.tests.conftest import ok
+
+WORKLOG_DATE = "2025-06-02"
+
+
+def _card(client, user, card_id: int) -> dict:
+    cards = ok(client.get("/cards/", params={"board_id": user["board_id"]}, headers=user["headers"]))
+    return next(card for card in cards if card["id"] == card_id)
+
+
+def _rebuild() -> tuple[int, int]:
+    from backend.cards.rollups import rebuild_card_hours, rebuild_card_subtasks
+    from backend.database import engine
+
+    with engine.begin() as connection:
+        return rebuild_card_hours(connection), rebuild_card_subtasks(connection)
+
+
+def test_increments_match_rebuild(client, user):
+    headers = user["headers"]
+    card = ok(client.post("/cards/", json={
+        "title": "Horas", "board_id": user["board_id"], "list_id": user["list_id"],
+    }, headers=headers))
+
+    # Sin redondear en cada incremento: 0.125 x 3 = 0.375 → 0.38
+    worklogs = [
+        ok(client.post(f"/cards/{card['id']}/worklogs", json={"date": WORKLOG_DATE, "hours": 0.125}, headers=headers))
+        for _ in range(3)
+    ]
+    assert _card(client, user, card["id"])["total_hours"] == 0.38
+
+    ok(client.post("/worklogs/batch", json={"items": [
+        {"card_id": card["id"], "date": WORKLOG_DATE, "hours": 0.1},
+        {"card_id": card["id"], "date": WORKLOG_DATE, "hours": 0.2},
+    ]}, headers=headers))
+    ok(client.patch(f"/worklogs/{worklogs[0]['id']}", json={"hours": 1.375}, headers=headers))
+    ok(client.delete(f"/worklogs/{worklogs[1]['id']}", headers=headers))
+
+    subtasks = [
+        ok(client.post(f"/cards/{card['id']}/subtasks", json={"title": f"Paso {i}"}, headers=headers))
+        for i in range(3)
+    ]
+    for subtask in subtasks[:2]:
+        ok(client.patch(f"/subtasks/{subtask['id']}", json={"completed": True}, headers=headers))
+    ok(client.delete(f"/subtasks/{subtasks[0]['id']}", headers=headers))
+
+    remaining = ok(client.get(f"/cards/{card['id']}/worklogs", headers=headers))
+    current = _card(client, user, card["id"])
+    assert current["total_hours"] == round(sum(w["hours"] for w in remaining), 2) == 1.8
+    assert (current["subtasks_total"], current["subtasks_completed"]) == (2, 1)
+
+    # La reconciliación no encuentra nada que corregir
+    assert _rebuild() == (0, 0)
+
+
+def test_rebuild_fixes_drift(client, user):
+    headers = user["headers"]
+    card = ok(client.post("/cards/", json={
+        "title": "Desajuste", "board_id": user["board_id"], "list_id": user["list_id"],
+    }, headers=headers))
+    ok(client.post(f"/cards/{card['id']}/worklogs", json={"date": WORKLOG_DATE, "hours": 2}, headers=headers))
+    ok(client.post(f"/cards/{card['id']}/subtasks", json={"title": "Paso"}, headers=headers))
+
+    from backend.database import engine
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE cards SET total_hours = 7, subtasks_total = 5 WHERE id = :id"),
+            {"id": card["id"]},
+        )
+
+    assert _rebuild() == (1, 1)
+    current = _card(client, user, card["id"])
+    assert current["total_hours"] == 2
+    assert current["subtasks_total"] == 1
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,11 @@ from backend.database import Base
 
 class WorkLog(Base):
     __tablename__ = "worklogs"
+    __table_args__ = (
+        # "Mis horas" por usuario y semana / horas por tarjeta y semana
+        Index("ix_worklogs_user_id_date", "user_id", "date"),
+        Index("ix_worklogs_card_id_date", "card_id", "date"),
+    )
 
     # --------------------------------------------------------
     # Identificador
@@ -40,6 +45,9 @@ class WorkLog(Base):
     hours = Column(Float, nullable=False)
     note = Column(String(200), nullable=True)
 
+    # Revisión del board en la que cambió por última vez (feed de cambios)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
     # --------------------------------------------------------
     # Metadatos
     # --------------------------------------------------------
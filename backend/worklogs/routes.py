@@ -1,16 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 import datetime
+import math
 from collections import defaultdict
 
 from backend.database import get_db
+from backend.auth.cache import Principal
 from backend.auth.utils import get_current_user
-from backend.models import User
+from backend.boards.revisions import add_tombstones, bump_card_revision, bump_revision, stamp_cards
+from backend.cards.models import Card
+from backend.cards.rollups import add_card_hours, add_cards_hours
+from backend.querystats import query_budget
+from backend.realtime.broker import publish_board_event
+from backend.reportsweek.cache import report_cache
 
 from .models import WorkLog
 from .schemas import (
     WorkLogCreate,
+    WorkLogBatchCreate,
+    WorkLogBatchResult,
     WorkLogUpdate,
     WorkLogOut,
     WorkLogDayTotal,
@@ -29,21 +39,28 @@ router = APIRouter(
 # Crear registro de horas
 # =========================================================
 @router.post("/cards/{card_id}/worklogs", response_model=WorkLogOut)
-def create_worklog(
+async def create_worklog(
     card_id: int,
     data: WorkLogCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     # -----------------------------
     # Validaciones obligatorias (reglas de negocio básicas)
     # -----------------------------
-    if data.hours <= 0:
+    # NaN pasaría el "<= 0" y contaminaría cards.total_hours
+    if not math.isfinite(data.hours) or data.hours <= 0:
         raise HTTPException(status_code=400, detail="Hours must be > 0")
 
     if data.date > date.today():
         raise HTTPException(status_code=400, detail="Date cannot be in the future")
 
+    # Nueva revisión del board (y de la tarjeta, cuyo total cambia)
+    stamp = await bump_card_revision(db, card_id)
+    if stamp is None:
+        raise HTTPException(status_code=404, detail="Card not found")
+    board_id, revision = stamp
+
     # -----------------------------
     # Crear worklog
     # -----------------------------
@@ -53,34 +70,132 @@ def create_worklog(
         date=data.date,
         hours=data.hours,
         note=data.note,
+        revision=revision,
     )
 
     db.add(worklog)
-    db.commit()
-    db.refresh(worklog)
+    # Total de horas de la tarjeta, en la misma transacción
+    await add_card_hours(db, card_id, data.hours)
+    await db.commit()
+    await db.refresh(worklog)
+
+    # Informes de horas de la semana del worklog
+    report_cache.touch(board_id, [worklog.date], summary=False)
+    await publish_board_event(board_id, revision, "worklog", "created", [worklog.id], card_id=card_id)
 
     return worklog
 
 
+# =========================================================
+# POST /worklogs/batch
+# Alta masiva de horas (p. ej. la hoja semanal completa)
+# =========================================================
+@router.post("/worklogs/batch", response_model=WorkLogBatchResult)
+async def create_worklogs_batch(
+    data: WorkLogBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Valida cada elemento con las mismas reglas que POST /cards/{id}/worklogs,
+    inserta los válidos con un único INSERT multi-fila y confirma una sola vez.
+    Devuelve los ids creados (en el orden de entrada) y los errores por índice.
+    """
+    # Tarjetas existentes, en una sola consulta
+    card_ids = {item.card_id for item in data.items}
+    card_boards = dict(
+        (await db.execute(select(Card.id, Card.board_id).where(Card.id.in_(card_ids)))).all()
+    )
+
+    # -----------------------------
+    # Validación por elemento
+    # -----------------------------
+    today = date.today()
+    rows, errors = [], []
+    for index, item in enumerate(data.items):
+        if item.date > today:
+            detail = "Date cannot be in the future"
+        elif item.note is not None and len(item.note) > 200:
+            detail = "Note must be at most 200 characters"
+        elif item.card_id not in card_boards:
+            detail = "Card not found"
+        else:
+            rows.append({
+                "card_id": item.card_id,
+                "user_id": current_user.id,
+                "date": item.date,
+                "hours": item.hours,
+                "note": item.note,
+            })
+            continue
+        errors.append({"index": index, "detail": detail})
+
+    if not rows:
+        return {"created": [], "errors": errors}
+
+    # -----------------------------
+    # INSERT multi-fila + totales por tarjeta, en una transacción
+    # -----------------------------
+    cards_by_board = defaultdict(set)
+    for row in rows:
+        cards_by_board[card_boards[row["card_id"]]].add(row["card_id"])
+
+    # Una revisión por board afectado; las tarjetas con horas nuevas se marcan
+    revisions = {}
+    for board_id in sorted(cards_by_board):
+        revisions[board_id] = await bump_revision(db, board_id)
+        await stamp_cards(db, cards_by_board[board_id], revisions[board_id])
+    for row in rows:
+        row["revision"] = revisions[card_boards[row["card_id"]]]
+
+    created = (
+        await db.scalars(
+            insert(WorkLog).returning(WorkLog.id, sort_by_parameter_order=True),
+            rows,
+        )
+    ).all()
+
+    deltas = defaultdict(float)
+    for row in rows:
+        deltas[row["card_id"]] += row["hours"]
+    await add_cards_hours(db, deltas)
+    await db.commit()
+
+    # Informes de horas de las semanas afectadas
+    touched = defaultdict(set)
+    for row in rows:
+        touched[card_boards[row["card_id"]]].add(row["date"])
+    for board_id, dates in touched.items():
+        report_cache.touch(board_id, dates, summary=False)
+
+    # Un evento por board con los worklogs creados en él
+    for board_id, revision in revisions.items():
+        ids = [wl_id for wl_id, row in zip(created, rows) if card_boards[row["card_id"]] == board_id]
+        await publish_board_event(board_id, revision, "worklog", "created", ids)
+
+    return {"created": created, "errors": errors}
+
+
 # =========================================================
 # GET /cards/{card_id}/worklogs
 # Listar horas por tarjeta
 # =========================================================
 @router.get("/cards/{card_id}/worklogs", response_model=list[WorkLogOut])
-def list_worklogs_by_card(
+async def list_worklogs_by_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     # 🔎 NOTA:
     # Aquí permitimos ver los worklogs de una tarjeta
     # a cualquier miembro del equipo (según requisitos)
     worklogs = (
-        db.query(WorkLog)
-        .filter(WorkLog.card_id == card_id)
-        .order_by(WorkLog.date.desc())
-        .all()
-    )
+        await db.scalars(
+            select(WorkLog)
+            .where(WorkLog.card_id == card_id)
+            .order_by(WorkLog.date.desc())
+        )
+    ).all()
 
     return worklogs
 
@@ -90,13 +205,13 @@ def list_worklogs_by_card(
 # Editar horas (solo autor)
 # =========================================================
 @router.patch("/worklogs/{worklog_id}", response_model=WorkLogOut)
-def update_worklog(
+async def update_worklog(
     worklog_id: int,
     data: WorkLogUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    worklog = db.query(WorkLog).filter(WorkLog.id == worklog_id).first()
+    worklog = await db.get(WorkLog, worklog_id)
 
     if not worklog:
         raise HTTPException(status_code=404, detail="Worklog not found")
@@ -105,11 +220,21 @@ def update_worklog(
     if worklog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    board_id, worklog.revision = await bump_card_revision(db, worklog.card_id)
+
+    previous_hours, previous_date = worklog.hours, worklog.date
     for field, value in data.dict(exclude_unset=True).items():
         setattr(worklog, field, value)
 
-    db.commit()
-    db.refresh(worklog)
+    await add_card_hours(db, worklog.card_id, worklog.hours - previous_hours)
+    await db.commit()
+    await db.refresh(worklog)
+
+    # Informes de horas de la semana anterior y la nueva
+    report_cache.touch(board_id, [previous_date, worklog.date], summary=False)
+    await publish_board_event(
+        board_id, worklog.revision, "worklog", "updated", [worklog.id], card_id=worklog.card_id
+    )
 
     return worklog
 
@@ -119,12 +244,12 @@ def update_worklog(
 # Eliminar horas (solo autor)
 # =========================================================
 @router.delete("/worklogs/{worklog_id}")
-def delete_worklog(
+async def delete_worklog(
     worklog_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    worklog = db.query(WorkLog).filter(WorkLog.id == worklog_id).first()
+    worklog = await db.get(WorkLog, worklog_id)
 
     if not worklog:
         raise HTTPException(status_code=404, detail="Worklog not found")
@@ -133,8 +258,16 @@ def delete_worklog(
     if worklog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    db.delete(worklog)
-    db.commit()
+    await db.delete(worklog)
+    await add_card_hours(db, worklog.card_id, -worklog.hours)
+    board_id, revision = await bump_card_revision(db, worklog.card_id)
+    add_tombstones(db, board_id, revision, "worklog", [worklog.id])
+    await db.commit()
+
+    report_cache.touch(board_id, [worklog.date], summary=False)
+    await publish_board_event(
+        board_id, revision, "worklog", "deleted", [worklog.id], card_id=worklog.card_id
+    )
 
     return {"message": "Worklog deleted"}
 
@@ -144,10 +277,11 @@ def delete_worklog(
 # Vista "Mis horas" (lista simple)
 # =========================================================
 @router.get("/users/me/worklogs", response_model=list[WorkLogOut])
-def get_my_worklogs(
+@query_budget(2)
+async def get_my_worklogs(
     week: str = Query(..., example="2025-52"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Devuelve los worklogs del usuario autenticado
@@ -162,15 +296,16 @@ def get_my_worklogs(
         raise HTTPException(status_code=400, detail="Semana ISO inválida")
 
     worklogs = (
-        db.query(WorkLog)
-        .filter(
-            WorkLog.user_id == current_user.id,
-            WorkLog.date >= start_date,
-            WorkLog.date <= end_date,
+        await db.scalars(
+            select(WorkLog)
+            .where(
+                WorkLog.user_id == current_user.id,
+                WorkLog.date >= start_date,
+                WorkLog.date <= end_date,
+            )
+            .order_by(WorkLog.date.asc())
         )
-        .order_by(WorkLog.date.asc())
-        .all()
-    )
+    ).all()
 
     return worklogs
 
@@ -183,10 +318,11 @@ def get_my_worklogs(
     "/users/me/worklogs/summary",
     response_model=WorkLogsWeekSummary
 )
-def get_my_worklogs_summary(
+@query_budget(2)
+async def get_my_worklogs_summary(
     week: str = Query(..., example="2025-52"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Vista 'Mis horas' avanzada:
@@ -203,15 +339,16 @@ def get_my_worklogs_summary(
         raise HTTPException(status_code=400, detail="Semana ISO inválida")
 
     worklogs = (
-        db.query(WorkLog)
-        .filter(
-            WorkLog.user_id == current_user.id,
-            WorkLog.date >= start_date,
-            WorkLog.date <= end_date,
+        await db.scalars(
+            select(WorkLog)
+            .where(
+                WorkLog.user_id == current_user.id,
+                WorkLog.date >= start_date,
+                WorkLog.date <= end_date,
+            )
+            .order_by(WorkLog.date.asc())
         )
-        .order_by(WorkLog.date.asc())
-        .all()
-    )
+    ).all()
 
     totals_by_day = defaultdict(float)
     total_week_hours = 0.0
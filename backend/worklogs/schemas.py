@@ -2,20 +2,23 @@ from pydantic import BaseModel, Field
 from datetime import date
 from typing import Optional, List
 
+from backend.config import WORKLOG_BATCH_MAX
+
 
 # =========================================================
-# Schemas existentes (NO SE TOCAN)
+# Alta / edición / salida de un worklog
+# (horas finitas y > 0: se validan aquí, antes de llegar a la ruta)
 # =========================================================
 
 class WorkLogCreate(BaseModel):
     date: date
-    hours: float = Field(gt=0)
+    hours: float = Field(gt=0, allow_inf_nan=False)
     note: Optional[str] = Field(None, max_length=200)
 
 
 class WorkLogUpdate(BaseModel):
     date: Optional[date] = None
-    hours: Optional[float] = Field(None, gt=0)
+    hours: Optional[float] = Field(None, gt=0, allow_inf_nan=False)
     note: Optional[str] = Field(None, max_length=200)
 
 
@@ -46,3 +49,31 @@ class WorkLogsWeekSummary(BaseModel):
     by_day: List[WorkLogDayTotal]
     worklogs: List[WorkLogOut]
 
+
+# =========================================================
+# Alta masiva (POST /worklogs/batch)
+# =========================================================
+# hours lleva las mismas restricciones que WorkLogCreate (un valor no válido
+# rechaza la petición entera con 422). El resto de reglas (fecha no futura,
+# tarjeta existente, nota) se validan por elemento en la ruta para poder
+# devolver errores individuales.
+
+class WorkLogBatchItem(BaseModel):
+    card_id: int
+    date: date
+    hours: float = Field(gt=0, allow_inf_nan=False)
+    note: Optional[str] = None
+
+
+class WorkLogBatchCreate(BaseModel):
+    items: List[WorkLogBatchItem] = Field(min_length=1, max_length=WORKLOG_BATCH_MAX)
+
+
+class WorkLogBatchError(BaseModel):
+    index: int
+    detail: str
+
+
+class WorkLogBatchResult(BaseModel):
+    created: List[int]
+    errors: List[WorkLogBatchError]
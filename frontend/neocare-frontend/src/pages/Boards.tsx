@@ -183,21 +183,29 @@ const Boards: React.FC = () => {
 
     const token = localStorage.getItem("token");
 
-    const response = await fetch(
-      `http://127.0.0.1:8000/cards/?board_id=${boardId}`,
-      {
+    // GET /cards devuelve páginas: se siguen los cursores (X-Next-Cursor)
+    // hasta tener todas las tarjetas del tablero
+    const data: any[] = [];
+    let cursor: string | null = null;
+
+    do {
+      const params = new URLSearchParams({ board_id: String(boardId), limit: "500" });
+      if (cursor) params.set("cursor", cursor);
+
+      const response = await fetch(`http://127.0.0.1:8000/cards/?${params}`, {
         headers: {
           Authorization: `Bearer ${token}`,
         },
-      }
-    );
+      });
 
-    if (!response.ok) {
-      console.error("Error al cargar tarjetas");
-      return;
-    }
+      if (!response.ok) {
+        console.error("Error al cargar tarjetas");
+        return;
+      }
 
-    const data = await response.json();
+      data.push(...(await response.json()));
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
 
     // Normalizamos campos para evitar null/undefined en UI
     const normalized = data.map((card: any) => ({